@@ -0,0 +1,87 @@
+# backend/benchmarks/cold_start.py
+"""
+Cold-start benchmark: import time of backend.main and time-to-first-successful-request.
+
+Run from the repo root:
+    PYTHONPATH=. python backend/benchmarks/cold_start.py --runs 5
+    PYTHONPATH=. python backend/benchmarks/cold_start.py --runs 5 --query "hi"
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import backend.main; "
+    "print(time.perf_counter() - t)"
+)
+
+def measure_import(env: dict) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+def wait_for(url: str, data: bytes | None, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                if resp.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.02)
+    return False
+
+def measure_first_request(env: dict, port: int, query: str | None, timeout: float) -> float | None:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        if query is None:
+            ok = wait_for(f"http://127.0.0.1:{port}/health", None, deadline)
+        else:
+            ok = wait_for(f"http://127.0.0.1:{port}/health", None, deadline) and wait_for(
+                f"http://127.0.0.1:{port}/chat", json.dumps({"query": query}).encode(), deadline
+            )
+        return time.perf_counter() - start if ok else None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def summarize(label: str, samples: list[float]):
+    if not samples:
+        print(f"{label}: no successful runs")
+        return
+    print(
+        f"{label}: median {statistics.median(samples) * 1000:.0f} ms, "
+        f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms (n={len(samples)})"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8190)
+    parser.add_argument("--query", default=None, help="also time the first successful POST /chat")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    for prewarm in ("0", "1"):
+        env = {**os.environ, "GENUI_PREWARM": prewarm}
+        imports = [measure_import(env) for _ in range(args.runs)]
+        firsts = [t for t in (measure_first_request(env, args.port, args.query, args.timeout) for _ in range(args.runs)) if t is not None]
+        print(f"--- GENUI_PREWARM={prewarm}")
+        summarize("import backend.main", imports)
+        summarize("time to first successful request", firsts)
+
+if __name__ == "__main__":
+    main()
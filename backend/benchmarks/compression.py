@@ -0,0 +1,88 @@
+# backend/benchmarks/compression.py
+"""
+Bandwidth and latency effect of response compression and ETag revalidation.
+
+Uses recorded /chat responses (a directory of JSON files, one response each)
+or a synthesized find_product response, and reports per encoding: body size,
+compression time and estimated transfer time on a few link speeds. Also
+measures SSE streaming with per-event flushing.
+
+Run from the repo root:
+    PYTHONPATH=. python backend/benchmarks/compression.py --responses recorded_responses/
+    PYTHONPATH=. python backend/benchmarks/compression.py
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+from backend.services.compression import Encoder, brotli
+from backend.services.etag import compute_etag
+
+LINKS_MBPS = {"3g": 1.6, "4g": 12.0, "wifi": 50.0}
+
+def synthesize() -> dict:
+    products = [
+        {
+            "title": f"Trekking tent {i} - 2 person - waterproof MT900",
+            "price": 129.99 + i,
+            "image": f"https://contents.mediadecathlon.com/p{2000000 + i}/k$8a2f5c7b3e1d9f0a/sq/tent-{i}.jpg?format=auto&f=800x800",
+            "url": f"https://www.decathlon.com/p/trekking-tent-{i}-2-person-waterproof/_/R-p-{300000 + i}?mc={8500000 + i}",
+            "brand": "FORCLAZ" if i % 2 else "QUECHUA",
+            "nature": "Tent",
+            "capacity": ["1 PERSON", "2 PERSONS", "3 PERSONS"],
+        }
+        for i in range(30)
+    ]
+    summary = "Most results are trekking tents.\n\n## Main Categories\n- **Tents**: ...\n\n## Recommendation\n..."
+    return {"result": summary, "products": products, "intent": "find_product"}
+
+def encode(body: bytes, encoding: str | None, runs: int) -> tuple[int, float]:
+    if encoding is None:
+        return len(body), 0.0
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        encoder = Encoder(encoding)
+        out = encoder.compress(body) + encoder.finish()
+        times.append(time.perf_counter() - start)
+    return len(out), statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", help="directory of recorded /chat JSON responses")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.responses:
+        payloads = [json.load(open(path)) for path in sorted(glob.glob(os.path.join(args.responses, "*.json")))]
+    else:
+        payloads = [synthesize()]
+    bodies = [json.dumps(payload).encode() for payload in payloads]
+    encodings = [None, "gzip"] + (["br"] if brotli else [])
+
+    print(f"{len(bodies)} response(s), {sum(map(len, bodies)) / len(bodies) / 1024:.1f} KB average")
+    for encoding in encodings:
+        results = [encode(body, encoding, args.runs) for body in bodies]
+        size = sum(r[0] for r in results) / len(results)
+        cpu = sum(r[1] for r in results) / len(results)
+        transfer = ", ".join(f"{link} {size * 8 / (mbps * 1e6) * 1000:.1f} ms" for link, mbps in LINKS_MBPS.items())
+        print(f"{encoding or 'identity':>8}: {size / 1024:7.1f} KB, compress {cpu * 1000:.2f} ms, transfer {transfer}")
+
+    # A repeated identical search revalidated with If-None-Match: only headers travel
+    etag = compute_etag(payloads[0])
+    print(f"     304: 0 KB body (ETag {etag})")
+
+    # SSE: the same text streamed as small events, each flushed on its own
+    text = payloads[0].get("result") if isinstance(payloads[0].get("result"), str) else json.dumps(payloads[0])
+    events = [f"data: {json.dumps({'content': text[i:i + 24]})}\n\n".encode() for i in range(0, len(text), 24)]
+    raw = sum(map(len, events))
+    for encoding in encodings[1:]:
+        encoder = Encoder(encoding)
+        flushed = sum(len(encoder.compress(event, flush=True)) for event in events) + len(encoder.finish())
+        print(f"SSE {encoding:>4}: {len(events)} events, {raw} B raw -> {flushed} B with per-event flush")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# backend/benchmarks/search_parse.py
+"""
+Compares full-body vs incremental parsing of Search API responses.
+
+Serves a recorded (or synthesized) multi-MB payload from a local HTTP server and
+times fetch_products against the previous response.json() path, reporting
+latency and peak Python memory (tracemalloc).
+
+Run from the repo root:
+    PYTHONPATH=. python backend/benchmarks/search_parse.py --payload recorded.json
+    PYTHONPATH=. python backend/benchmarks/search_parse.py --items 5000 --metadata
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from backend.services import search
+from backend.services.cache import TTLCache
+from backend.services.products import extract_products_from_response
+
+def synthesize(items: int) -> bytes:
+    blocks = [
+        {
+            "brand": {"label": f"Brand {i % 12}"},
+            "natureLabel": f"Nature {i % 7}",
+            "url": f"https://www.decathlon.com/p/{i}",
+            "webLabel": f"Product {i}",
+            "description": "Lorem ipsum dolor sit amet. " * 20,
+            "models": [
+                {
+                    "webLabel": f"Product {i} model {m}",
+                    "image": {"url": f"https://contents.mediadecathlon.com/p{i}/k$m{m}/picture.jpg?format=auto&quality=40"},
+                    "price": 19.99 + m,
+                    "url": f"https://www.decathlon.com/p/{i}?mc={m}",
+                    "availableSizes": ["XS", "S", "M", "L", "XL"],
+                }
+                for m in range(3)
+            ],
+        }
+        for i in range(items)
+    ]
+    payload = {"data": {"blocks": {"items": blocks}}, "stats": {"took": 42, "llm_output": {"category": "tents"}}}
+    return json.dumps(payload).encode()
+
+def serve(body: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the streaming client hangs up early on purpose
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def full_body_fetch(query: str, max_items: int, return_metadata: bool):
+    response = requests.post(search.SEARCH_API_URL, json={"query": query}, timeout=10)
+    response.raise_for_status()
+    return extract_products_from_response(response.json(), max_items, return_metadata)
+
+def measure(fn, runs: int, **kwargs) -> tuple[list[float], int]:
+    times, peak = [], 0
+    for _ in range(runs):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn("tent", **kwargs)
+        times.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return times, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payload", help="recorded Search API response (JSON file)")
+    parser.add_argument("--items", type=int, default=5000, help="items to synthesize when no payload is given")
+    parser.add_argument("--max-items", type=int, default=10)
+    parser.add_argument("--metadata", action="store_true", help="also extract stats.llm_output")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    body = open(args.payload, "rb").read() if args.payload else synthesize(args.items)
+    server = serve(body)
+    search.SEARCH_API_URL = f"http://127.0.0.1:{server.server_address[1]}/search"
+    # Every run must parse: a size-0 cache keeps fetch_products from answering repeats from memory
+    search.search_cache = TTLCache("search", max_size=0)
+    print(f"payload: {len(body) / 1e6:.1f} MB, max_items={args.max_items}, metadata={args.metadata}")
+
+    kwargs = {"max_items": args.max_items, "return_metadata": args.metadata}
+    for label, fn in (("full body", full_body_fetch), ("incremental", search.fetch_products)):
+        times, peak = measure(fn, args.runs, **kwargs)
+        print(
+            f"{label:>12}: median {statistics.median(times) * 1000:.1f} ms, "
+            f"min {min(times) * 1000:.1f} ms, peak memory {peak / 1e6:.1f} MB"
+        )
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
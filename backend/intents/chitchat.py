@@ -1,6 +1,14 @@
 # backend/intents/chitchat.py
-from backend.services.gemini import generate_response
+from backend.services.gemini import generate_response, generate_stream_response
+from fastapi import WebSocket
+import asyncio
 
-async def handle_chitchat(query: str, intent: str):
-    answer = generate_response(query)
+async def handle_chitchat(query: str, intent: str, websocket: WebSocket = None):
+    if websocket:
+        answer = ""
+        async for chunk in generate_stream_response(query):
+            answer += chunk
+            await websocket.send_json({"event": "text", "content": chunk})
+    else:
+        answer = await asyncio.to_thread(generate_response, query)
     return {"result": answer, "products": [], "intent": intent}
@@ -1,6 +1,8 @@
 # backend/intents/compare.py
 from backend.services.gemini import generate_response
 from backend.services.products import extract_products_from_response
+from backend.services.scheduler import ModelOverloaded
+import asyncio
 import logging
 import json
 
@@ -44,7 +46,7 @@ async def handle_compare(query: str, intent: str, products=None):
     )
     
     try:
-        response = generate_response(comparison_prompt, products)
+        response = await asyncio.to_thread(generate_response, comparison_prompt, products)
         logger.info(f"💡 Raw comparison response from Gemini: {response}")
 
         # Ensure response is valid JSON
@@ -65,6 +67,8 @@ async def handle_compare(query: str, intent: str, products=None):
             "structured": True
         }
         
+    except ModelOverloaded:
+        raise
     except json.JSONDecodeError as e:
         logger.error(f"JSON parsing error: {e}")
         logger.error(f"Problematic response: {response}")
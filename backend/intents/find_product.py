@@ -1,39 +1,120 @@
 # backend/intents/find_product.py
-from services.search import fetch_products
-from backend.services.gemini import generate_response
+from backend.services.search import fetch_products
+from backend.services.gemini import generate_content_stream, generate_response
+from backend.services.scheduler import ModelOverloaded, scheduler
+from backend.services.facets import compute_facets, render_summary
+from backend.services.cache import decomposition_cache, normalize_query
+from backend.services.pagination import fuse_products, open_cursor
+from backend.services.speculation import discard_speculation, use_speculation
 from collections import Counter
 from fastapi import WebSocket
+import asyncio
+import contextlib
 import logging
 import json
+import os
 
 logger = logging.getLogger("main")
 
-async def handle_find_product(query: str, intent: str, websocket: WebSocket = None):
+# GENUI_LLM_NARRATIVE: "async" (default) also streams the model-written category
+# summary over /ws as "narrative" events after the result, unless the model is
+# under load; "off" only sends the summary rendered from the facets.
+LLM_NARRATIVE = os.getenv("GENUI_LLM_NARRATIVE", "async").lower()
+
+# Running narrative tasks, referenced so they are not garbage collected
+_narratives: set[asyncio.Task] = set()
+
+def decompose_query(query: str) -> list[str]:
+    """
+    Rewrites a query into 1-3 search sub-queries with Gemini, cached per query.
+    """
+    key = normalize_query(query)
+    cached = decomposition_cache.get(key)
+    if cached is not None:
+        return cached
+
+    decomposition_prompt = (
+        "You are an intelligent assistant for a sports e-commerce platform. Your role is to rewrite customer queries to enhance search relevance and accuracy.\n\n"
+        "Follow these guidelines based on the query type:\n"
+        "1. For simple and focused queries containing just one product or sport, return a single clean sub-query with the main item to search (e.g., 'search a tent' becomes 'tent').\n"
+        "2. For complex queries mentioning multiple sports, general contexts, or compound requests, decompose them into up to 3 structured sub-queries as follows:\n"
+        "   - Sub-query 1: The general sport or activity (e.g., 'hiking').\n"
+        "   - Sub-query 2: A relevant product for that sport (e.g., 'shoes').\n"
+        "   - Sub-query 3: Another relevant product for that sport (e.g., 'backpack').\n\n"
+        f"Query: {query}\n"
+        "Output: Provide 1 to 3 sub-queries, one per line. Do not number them.\n"
+    )
+
+    sub_queries_response = generate_response(decomposition_prompt)
+    sub_queries = [line.strip() for line in sub_queries_response.split("\n") if line.strip()]
+    # generate_response reports failures as a JSON object, never a valid decomposition
+    if sub_queries and not sub_queries_response.lstrip().startswith("{"):
+        decomposition_cache.set(key, sub_queries)
+    return sub_queries
+
+async def stream_narrative(prompt: str, websocket: WebSocket):
+    """
+    Streams the model's category summary as "narrative" events, always ending
+    with "narrative_done" so the client can stop waiting.
+    """
     try:
-        # Step 1: Decompose the query using Gemini
-        decomposition_prompt = (
-            "You are an intelligent assistant for a sports e-commerce platform. Your role is to rewrite customer queries to enhance search relevance and accuracy.\n\n"
-            "Follow these guidelines based on the query type:\n"
-            "1. For simple and focused queries containing just one product or sport, return a single clean sub-query with the main item to search (e.g., 'search a tent' becomes 'tent').\n"
-            "2. For complex queries mentioning multiple sports, general contexts, or compound requests, decompose them into up to 3 structured sub-queries as follows:\n"
-            "   - Sub-query 1: The general sport or activity (e.g., 'hiking').\n"
-            "   - Sub-query 2: A relevant product for that sport (e.g., 'shoes').\n"
-            "   - Sub-query 3: Another relevant product for that sport (e.g., 'backpack').\n\n"
-            f"Query: {query}\n"
-            "Output: Provide 1 to 3 sub-queries, one per line. Do not number them.\n"
-        )
+        async for chunk in generate_content_stream(prompt, priority="summary"):
+            if hasattr(chunk, 'text') and chunk.text:
+                await websocket.send_json({"event": "narrative", "content": chunk.text})
+    except ModelOverloaded:
+        logger.info("⏭️ Narrative shed, the model is overloaded")
+    except Exception as e:
+        logger.error(f"Error in stream_narrative: {e}")
+    finally:
+        # The socket may be gone by now
+        with contextlib.suppress(Exception):
+            await websocket.send_json({"event": "narrative_done"})
+
+def start_narrative(prompt: str, websocket: WebSocket) -> bool:
+    """
+    Schedules the narrative in the background unless it is off or the model is
+    busy. On a /ws request channel the task is tracked by the channel, so
+    cancelling the request cancels its narrative too.
+    """
+    if LLM_NARRATIVE != "async" or websocket is None or scheduler.under_load():
+        return False
+    task = asyncio.create_task(stream_narrative(prompt, websocket))
+    _narratives.add(task)
+    task.add_done_callback(_narratives.discard)
+    if hasattr(websocket, "track"):
+        websocket.track(task)
+    return True
 
-        sub_queries_response = generate_response(decomposition_prompt)
-        sub_queries = [line.strip() for line in sub_queries_response.split("\n") if line.strip()]
+async def handle_find_product(query: str, intent: str, websocket: WebSocket = None, speculative: asyncio.Task = None, page_size: int = None):
+    # With page_size, only that many products are fetched per sub-query up front;
+    # later pages come from the result cursor and deepen the searches on demand.
+    depth = page_size or 10
+    try:
+        # Step 1: Decompose the query using Gemini
+        sub_queries = await asyncio.to_thread(decompose_query, query)
+        if websocket:
+            await websocket.send_json({"event": "sub_queries", "sub_queries": sub_queries})
 
-        # Step 2: Search for products for each sub-query
+        # Step 2: Search for products for each sub-query. A speculative search of
+        # the raw query stands in for the sub-query identical to it, if any.
+        raw_query = normalize_query(query)
+        if speculative and raw_query not in map(normalize_query, sub_queries):
+            discard_speculation(speculative, "unused")
+            speculative = None
         all_products = []
         for sub_query in sub_queries:
             if websocket:
                 await websocket.send_json({"event": "toaster", "message": f"Searching for: {sub_query}"})
-            products = fetch_products(sub_query)
+            products = None
+            if speculative and normalize_query(sub_query) == raw_query:
+                products = await use_speculation(speculative)
+                speculative = None
+            if products is None:
+                products = await asyncio.to_thread(fetch_products, sub_query, depth)
             if products:
                 all_products.extend(products)
+                if websocket:
+                    await websocket.send_json({"event": "products", "sub_query": sub_query, "products": products})
 
         # Step 3: Rank the top 10 products
         if all_products:
@@ -42,7 +123,12 @@ async def handle_find_product(query: str, intent: str, websocket: WebSocket = No
             top_10_product_titles = [product[0] for product in product_counts.most_common(10)]
             filtered_products = [product for product in all_products if product['title'] in top_10_product_titles]
 
-            # Generate Markdown explanation
+            # Summarize from facets computed locally over what the client gets: the
+            # returned products or, when paging, the whole list the cursor serves.
+            # The model-written version follows over /ws when there is capacity.
+            fused = fuse_products(all_products) if page_size else None
+            facets = compute_facets(fused if page_size else filtered_products)
+            summary = render_summary(query, facets)
             top_products_prompt = (
                 f"You are a helpful assistant for a sports e-commerce platform. Below is a JSON list of products and their occurrence counts, retrieved in response to a user query.\n\n"
                 f"**Query:** {query}\n\n"
@@ -55,12 +141,24 @@ async def handle_find_product(query: str, intent: str, websocket: WebSocket = No
                 "4. Ensure the response is **brief, clear, and actionable**. Avoid unnecessary details or repetition.\n"
             )
 
-            top_products_response = generate_response(top_products_prompt)
+            narrative = start_narrative(top_products_prompt, websocket)
 
+            if page_size:
+                page, next_cursor = open_cursor(query, sub_queries, fused, depth, page_size)
+                return {
+                    "result": summary,
+                    "products": page,
+                    "intent": intent,
+                    "facets": facets,
+                    "narrative": narrative,
+                    "next_cursor": next_cursor,
+                }
             return {
-                "result": top_products_response.strip(),
+                "result": summary,
                 "products": filtered_products,
                 "intent": intent,
+                "facets": facets,
+                "narrative": narrative,
             }
         else:
             return {
@@ -69,6 +167,8 @@ async def handle_find_product(query: str, intent: str, websocket: WebSocket = No
                 "intent": intent,
             }
 
+    except ModelOverloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in handle_find_product: {e}")
         if websocket:
@@ -78,3 +178,6 @@ async def handle_find_product(query: str, intent: str, websocket: WebSocket = No
             "products": [],
             "intent": intent,
         }
+    finally:
+        # Decomposition failed or the request was cancelled before the search was used
+        discard_speculation(speculative, "unused")
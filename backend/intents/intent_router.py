@@ -1,17 +1,36 @@
 # backend/intents/intent_router.py
 from backend.services.gemini import detect_intent
+from backend.services.speculation import start_speculative_search, discard_speculation
+from backend.services.scheduler import current_intent
 from backend.intents.find_product import handle_find_product
 from backend.intents.chitchat import handle_chitchat
 from backend.intents.compare import handle_compare
 from backend.intents.reassure import handle_reassure
+from fastapi import WebSocket
+import asyncio
 
-async def route_intent(query: str, products=None):
-    intent = detect_intent(query)
+async def route_intent(query: str, products=None, intent: str = None, websocket: WebSocket = None, page_size: int = None):
+    speculative = None
+    if intent is None:
+        speculative = start_speculative_search(query, page_size or 10)
+        try:
+            intent = await asyncio.to_thread(detect_intent, query)
+        except BaseException:
+            discard_speculation(speculative)
+            raise
+        # The search keeps running into find_product, which awaits it only if a
+        # sub-query turns out to be the raw query
+        if intent != "find_product":
+            discard_speculation(speculative)
+            speculative = None
+    current_intent.set(intent)
+    if websocket:
+        await websocket.send_json({"event": "intent", "intent": intent})
     if intent == "find_product":
-        return await handle_find_product(query, intent)
+        return await handle_find_product(query, intent, websocket, speculative=speculative, page_size=page_size)
     elif intent == "compare":
         return await handle_compare(query, intent, products)
     elif intent == "reassure":
-        return await handle_reassure(query, intent)
+        return await handle_reassure(query, intent, websocket)
     else:
-        return await handle_chitchat(query, intent)
\ No newline at end of file
+        return await handle_chitchat(query, intent, websocket)
@@ -3,8 +3,16 @@
 Handles reassurance/FAQ-style queries (stub for future FAQ integration).
 """
 
-from backend.services.gemini import generate_response
+from backend.services.gemini import generate_response, generate_stream_response
+from fastapi import WebSocket
+import asyncio
 
-async def handle_reassure(query: str, intent: str):
-    response = generate_response(query)
+async def handle_reassure(query: str, intent: str, websocket: WebSocket = None):
+    if websocket:
+        response = ""
+        async for chunk in generate_stream_response(query):
+            response += chunk
+            await websocket.send_json({"event": "text", "content": chunk})
+    else:
+        response = await asyncio.to_thread(generate_response, query)
     return {"result": response, "products": [], "intent": intent}
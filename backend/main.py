@@ -1,9 +1,21 @@
 # backend/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from backend.routes.chat import router as chat_router
+from backend.routes.metrics import router as metrics_router
+from backend.routes.ws import router as ws_router
+from backend.routes.profiles import router as profiles_router
 from backend.routes.stream import stream_handler
+from backend.services.gemini import preload_sdk
+from backend.services.warmup import prewarm, warm_popular_queries
+from backend.services.scheduler import ModelOverloaded
+from backend.services.profiler import ProfilingMiddleware
+from backend.services.compression import CompressionMiddleware
+import asyncio
 import logging
+import os
 
 # Set up root logger to print to stdout
 logging.basicConfig(
@@ -11,9 +23,29 @@ logging.basicConfig(
     format="%(levelname)s:%(name)s:%(message)s"
 )
 
-app = FastAPI()
 logger = logging.getLogger(__name__)
-logger.info("🚀 FastAPI backend started.")
+
+# GENUI_PREWARM: build the Gemini client and Search API connection in the background at startup.
+# GENUI_PRELOAD: import the Vertex SDK at module import, for pre-fork servers (e.g. gunicorn --preload)
+# so forked workers share it. The client itself is always created lazily, after fork.
+PREWARM = os.getenv("GENUI_PREWARM", "1") == "1"
+PRELOAD = os.getenv("GENUI_PRELOAD", "0") == "1"
+
+if PRELOAD:
+    preload_sdk()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.warmup_task = asyncio.create_task(prewarm()) if PREWARM else None
+    # No-op unless GENUI_QUERY_LOG is set; runs in the background so readiness isn't delayed
+    app.state.cache_warmup_task = asyncio.create_task(warm_popular_queries())
+    logger.info("🚀 FastAPI backend started.")
+    yield
+    for task in (app.state.warmup_task, app.state.cache_warmup_task):
+        if task and not task.done():
+            task.cancel()
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.add_middleware(
@@ -22,9 +54,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id", "ETag"],
 )
 
+# Per-client br/gzip for JSON, NDJSON and SSE responses
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in per-request profiling: "X-Profile: <GENUI_PROFILE_TOKEN>" header or GENUI_PROFILE_SAMPLE_RATE
+app.add_middleware(ProfilingMiddleware)
+
+@app.exception_handler(ModelOverloaded)
+async def model_overloaded_handler(request: Request, exc: ModelOverloaded):
+    logger.warning(f"🚦 Shedding {request.url.path}: {exc}")
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": "1"})
+
 app.include_router(chat_router)
+app.include_router(metrics_router)
+app.include_router(ws_router)
+app.include_router(profiles_router)
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
 
 @app.post("/stream")
 async def handle_stream(request: Request):
@@ -1,9 +1,15 @@
 from fastapi import FastAPI, UploadFile
 from bs4 import BeautifulSoup
 from typing import Dict, Any
+from backend.routes.profiles import router as profiles_router
+from backend.services.profiler import ProfilingMiddleware
+from backend.services.compression import CompressionMiddleware
 import json
 
 app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.include_router(profiles_router)
 
 @app.post("/parse")
 async def parse_html(file: UploadFile) -> Dict[str, Any]:
@@ -1,15 +1,102 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from backend.intents.intent_router import route_intent
+from backend.services.gemini import detect_intents_batch, BATCH_INTENT_SIZE
+from backend.services.scheduler import call_priority
+from backend.services.warmup import record_early_request
+from backend.services.etag import conditional_json
+from backend.services.cache import normalize_query
+from backend.services.pagination import clamp_page_size, read_page
+import asyncio
+import json
 import logging
+import time
 
 logger = logging.getLogger("main")
 
 router = APIRouter()
 
+# Max number of route_intent handlers running at once for one /chat/batch request
+BATCH_CONCURRENCY = 8
+# Max number of queries accepted in one /chat/batch request
+MAX_BATCH_QUERIES = 500
+
 @router.post("/chat")
 async def chat_handler(request: Request):
     body = await request.json()
     query = body.get("query", "").lower()
     products = body.get("products", [])
+    try:
+        page_size = clamp_page_size(body.get("page_size"))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     logger.info(f"📩 Incoming query: {query}")
-    return await route_intent(query, products)
+    start = time.perf_counter()
+    result = await route_intent(query, products, page_size=page_size)
+    record_early_request(query, time.perf_counter() - start)
+    # Product result sets are often re-requested unchanged; let clients revalidate
+    if result.get("products"):
+        return conditional_json(request, result)
+    return result
+
+@router.post("/chat/page")
+async def chat_page_handler(request: Request):
+    body = await request.json()
+    cursor = body.get("cursor")
+    if not isinstance(cursor, str) or not cursor:
+        raise HTTPException(status_code=422, detail="cursor must be a non-empty string")
+    try:
+        page_size = clamp_page_size(body.get("page_size")) or 10
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    page = await asyncio.to_thread(read_page, cursor, page_size)
+    if page is None:
+        raise HTTPException(status_code=410, detail="Cursor expired or invalid; repeat the search")
+    products, next_cursor = page
+    return conditional_json(request, {"products": products, "next_cursor": next_cursor, "intent": "find_product"})
+
+async def generate_batch_results(positions: dict[str, list[int]], intents: list[str]):
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(query: str, intent: str):
+        # Everything issued on behalf of a batch queues behind interactive traffic
+        call_priority.set("batch")
+        async with semaphore:
+            try:
+                return query, await route_intent(query, intent=intent)
+            except Exception as e:
+                logger.error(f"❌ Batch query failed: {query}: {e}")
+                return query, {"error": str(e), "intent": intent}
+
+    tasks = [asyncio.create_task(run(query, intent)) for query, intent in zip(positions, intents)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            query, result = await finished
+            for index in positions[query]:
+                yield json.dumps({"index": index, "query": query, **result}) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@router.post("/chat/batch")
+async def chat_batch_handler(request: Request):
+    body = await request.json()
+    queries = body.get("queries", []) if isinstance(body, dict) else None
+    if not isinstance(queries, list) or not all(isinstance(query, str) for query in queries):
+        raise HTTPException(status_code=422, detail="queries must be a list of strings")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+
+    # Dedupe on the cache key normalization, remembering every position
+    positions: dict[str, list[int]] = {}
+    for index, raw in enumerate(queries):
+        positions.setdefault(normalize_query(raw), []).append(index)
+    unique = list(positions)
+    logger.info(f"📦 Batch of {len(queries)} queries ({len(unique)} unique)")
+
+    # Classified before the stream starts, so an overloaded model still gets a clean 503
+    chunks = [unique[i:i + BATCH_INTENT_SIZE] for i in range(0, len(unique), BATCH_INTENT_SIZE)]
+    labelled = await asyncio.gather(*(asyncio.to_thread(detect_intents_batch, chunk) for chunk in chunks))
+    intents = [intent for chunk in labelled for intent in chunk]
+
+    return StreamingResponse(generate_batch_results(positions, intents), media_type="application/x-ndjson")
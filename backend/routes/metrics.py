@@ -0,0 +1,23 @@
+# backend/routes/metrics.py
+from fastapi import APIRouter
+from backend.services.speculation import speculation_stats
+from backend.services.scheduler import scheduler
+from backend.services.warmup import warmup_stats
+from backend.services.cache import intent_cache, decomposition_cache, search_cache
+
+router = APIRouter()
+
+@router.get("/metrics/speculation")
+async def speculation_metrics():
+    return speculation_stats()
+
+@router.get("/metrics/scheduler")
+async def scheduler_metrics():
+    return scheduler.stats()
+
+@router.get("/metrics/warmup")
+async def warmup_metrics():
+    return {
+        **warmup_stats(),
+        "caches": {cache.name: cache.stats() for cache in (intent_cache, decomposition_cache, search_cache)},
+    }
@@ -0,0 +1,27 @@
+# backend/routes/profiles.py
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse
+from backend.services.profiler import list_profiles, profile_path, profile_authorized, collapsed_to_speedscope
+
+def require_profile_token(request: Request):
+    # Stacks expose code paths and arguments; 404 rather than 401 so the
+    # endpoints do not advertise themselves without the token
+    if not profile_authorized(request.headers.get("x-profile")):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+router = APIRouter(dependencies=[Depends(require_profile_token)])
+
+@router.get("/profiles")
+async def get_profiles():
+    return list_profiles()
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, format: str = "collapsed"):
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "speedscope":
+        with open(path, encoding="utf-8") as f:
+            profile = collapsed_to_speedscope(name, f.read())
+        return JSONResponse(profile, headers={"Content-Disposition": f'attachment; filename="{name}.speedscope.json"'})
+    return FileResponse(path, media_type="text/plain", filename=name)
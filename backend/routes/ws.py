@@ -0,0 +1,143 @@
+# backend/routes/ws.py
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from backend.intents.intent_router import route_intent
+from backend.services.pagination import clamp_page_size
+from backend.services.warmup import record_early_request
+import asyncio
+import contextlib
+import json
+import logging
+import time
+
+logger = logging.getLogger("main")
+
+router = APIRouter()
+
+class RequestChannel:
+    """
+    Per-request view of a shared WebSocket: tags every event with the request ID
+    and serializes sends from concurrently running requests. Also tracks the
+    tasks working for the request (the request itself and background work such
+    as a narrative that outlives the result) so they are cancelled together.
+    """
+
+    def __init__(self, websocket: WebSocket, request_id: str, send_lock: asyncio.Lock, on_idle=None):
+        self.websocket = websocket
+        self.request_id = request_id
+        self.send_lock = send_lock
+        self.on_idle = on_idle
+        self.tasks: set[asyncio.Task] = set()
+
+    def track(self, task: asyncio.Task):
+        self.tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not self.tasks and self.on_idle:
+            self.on_idle(self)
+
+    def cancel(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+    async def send_json(self, payload: dict):
+        async with self.send_lock:
+            await self.websocket.send_json({"id": self.request_id, **payload})
+
+async def run_request(channel: RequestChannel, query: str, products, page_size: int = None):
+    try:
+        start = time.perf_counter()
+        result = await route_intent(query, products, websocket=channel, page_size=page_size)
+        # Measured to the result, like /chat; a narrative streamed afterwards is not counted
+        record_early_request(query, time.perf_counter() - start)
+        await channel.send_json({"event": "result", **result})
+    except asyncio.CancelledError:
+        # The socket may already be gone if the cancel came from a disconnect
+        with contextlib.suppress(Exception):
+            await channel.send_json({"event": "cancelled"})
+        raise
+    except Exception as e:
+        logger.error(f"❌ WebSocket request {channel.request_id} failed: {e}")
+        await channel.send_json({"event": "error", "message": str(e)})
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket):
+    """
+    One connection per client; messages are multiplexed by request ID.
+
+    Client messages:
+      {"id": "r1", "query": "...", "products": [...], "page_size": 10, "cancel_previous": true}
+      {"type": "cancel", "id": "r1"}
+
+    Server events carry the same "id" and an "event" of intent, toaster,
+    sub_queries, products, text, result, cancelled or error. A find_product
+    result with "narrative": true is followed by narrative events and a final
+    narrative_done.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    in_flight: dict[str, RequestChannel] = {}
+
+    def cancel(request_id: str):
+        channel = in_flight.pop(request_id, None)
+        if channel:
+            channel.cancel()
+
+    def forget(channel: RequestChannel):
+        if in_flight.get(channel.request_id) is channel:
+            del in_flight[channel.request_id]
+
+    async def reject(request_id, reason: str):
+        # Only the offending request fails; the shared connection stays open
+        logger.warning(f"⚠️ Rejected WebSocket message {request_id!r}: {reason}")
+        async with send_lock:
+            await websocket.send_json({"id": request_id, "event": "error", "message": reason})
+
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except KeyError:
+                # receive_text on a binary frame
+                await reject(None, "Messages must be JSON text frames")
+                continue
+            except ValueError:
+                await reject(None, "Messages must be valid JSON")
+                continue
+            if not isinstance(message, dict):
+                await reject(None, "Messages must be JSON objects")
+                continue
+            request_id = str(message.get("id", ""))
+
+            if message.get("type") == "cancel":
+                cancel(request_id)
+                continue
+
+            query = message.get("query", "")
+            if not isinstance(query, str):
+                await reject(request_id, "query must be a string")
+                continue
+            try:
+                page_size = clamp_page_size(message.get("page_size"))
+            except ValueError as e:
+                await reject(request_id, str(e))
+                continue
+
+            # A new message supersedes whatever this client still has running
+            if message.get("cancel_previous", True):
+                for previous in list(in_flight):
+                    cancel(previous)
+            elif request_id in in_flight:
+                cancel(request_id)
+
+            query = query.lower()
+            logger.info(f"📩 Incoming query: {query}")
+            channel = RequestChannel(websocket, request_id, send_lock, on_idle=forget)
+            in_flight[request_id] = channel
+            channel.track(asyncio.create_task(run_request(channel, query, message.get("products", []), page_size)))
+    except WebSocketDisconnect:
+        logger.info("🔌 WebSocket client disconnected")
+    finally:
+        for request_id in list(in_flight):
+            cancel(request_id)
@@ -0,0 +1,67 @@
+# backend/services/cache.py
+from collections import OrderedDict
+import os
+import threading
+import time
+
+# GENUI_CACHE_TTL: seconds an entry stays fresh. GENUI_CACHE_SIZE: entries per cache.
+CACHE_TTL = float(os.getenv("GENUI_CACHE_TTL", "900"))
+CACHE_SIZE = int(os.getenv("GENUI_CACHE_SIZE", "2048"))
+
+_MISSING = object()
+
+def normalize_query(query: str) -> str:
+    """Cache key for a user query: lowercased with whitespace collapsed."""
+    return " ".join(query.lower().split())
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed TTL.
+    """
+
+    def __init__(self, name: str, ttl: float = CACHE_TTL, max_size: int = CACHE_SIZE):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not _MISSING:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > time.monotonic()
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+intent_cache = TTLCache("intent")
+decomposition_cache = TTLCache("decomposition")
+search_cache = TTLCache("search")
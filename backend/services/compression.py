@@ -0,0 +1,138 @@
+# backend/services/compression.py
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Response types worth compressing, and the streaming ones among them that must
+# be flushed chunk by chunk so events reach the client as they are produced.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/event-stream", "text/plain", "text/markdown")
+STREAMING_TYPES = ("application/x-ndjson", "text/event-stream")
+
+# Complete bodies smaller than this go out uncompressed
+MINIMUM_SIZE = 512
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Picks br or gzip from an Accept-Encoding header, honouring q=0."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    for encoding in (("br",) if brotli else ()) + ("gzip",):
+        if offered.get(encoding, offered.get("*", 0)) > 0:
+            return encoding
+    return None
+
+class Encoder:
+    def __init__(self, encoding: str, level: int = 6):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._gz = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compresses a chunk; with flush, everything so far is emitted and decodable."""
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + self._br.flush() if flush else out
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+def _with_vary(headers: list) -> list:
+    """Response headers with Accept-Encoding added to Vary (merged, not duplicated)."""
+    vary = [value for name, value in headers if name.lower() == b"vary"]
+    if any(b"accept-encoding" in value.lower() for value in vary):
+        return headers
+    merged = b", ".join(vary + [b"Accept-Encoding"])
+    return [(name, value) for name, value in headers if name.lower() != b"vary"] + [(b"vary", merged)]
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON, NDJSON and SSE responses with the best
+    encoding the client accepts (br when the brotli package is installed, else
+    gzip). Streamed NDJSON/SSE bodies are flushed after every chunk so
+    compression never holds back an event. Every response, compressed or
+    not, carries Vary: Accept-Encoding, since which one is sent depends on it.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"accept-encoding"), "")
+        encoding = negotiate_encoding(accept)
+        if encoding is None:
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": _with_vary(list(message.get("headers", [])))}
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        encoder = None
+        streaming = False
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, streaming, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = {name.lower(): value for name, value in start_message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip()
+                if (
+                    content_type not in COMPRESSIBLE_TYPES
+                    or b"content-encoding" in headers
+                    or start_message["status"] in (204, 304)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send({**start_message, "headers": _with_vary(list(start_message.get("headers", [])))})
+                    await send(message)
+                    return
+                streaming = content_type in STREAMING_TYPES
+                encoder = Encoder(encoding, self.level)
+                response_headers = _with_vary([
+                    (name, value) for name, value in start_message.get("headers", [])
+                    if name.lower() != b"content-length"
+                ])
+                response_headers.append((b"content-encoding", encoding.encode()))
+                await send({**start_message, "headers": response_headers})
+
+            if more_body:
+                chunk = encoder.compress(body, flush=streaming)
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.compress(body) + encoder.finish()})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,33 @@
+# backend/services/etag.py
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+import hashlib
+import json
+
+def compute_etag(payload) -> str:
+    """
+    Weak validator over the canonical JSON of a payload. Weak because the same
+    payload may be sent with different content encodings.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return f'W/"{hashlib.sha256(canonical.encode()).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def conditional_json(request: Request, payload) -> Response:
+    """
+    Returns payload as JSON with an ETag, or a bodiless 304 when the client's
+    If-None-Match already names this exact payload.
+    """
+    etag = compute_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
@@ -0,0 +1,113 @@
+# backend/services/facets.py
+from collections import Counter
+import math
+
+# Upper bounds of the price-range facet; the last range is open-ended
+PRICE_BUCKETS = (25, 50, 100, 200, 500)
+
+def _price(product: dict) -> float | None:
+    try:
+        price = float(product.get("price"))
+    except (TypeError, ValueError):
+        return None
+    # float() also accepts "nan" and "inf", which are no usable price
+    return price if math.isfinite(price) else None
+
+def _bucket_label(price: float) -> str:
+    lower = 0
+    for upper in PRICE_BUCKETS:
+        if price < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+def compute_facets(products: list[dict]) -> dict:
+    """
+    Category (nature), brand, price-range and size-availability aggregates over
+    a result set, computed in one pass. Each category also keeps its own
+    product count, price span and brands for the summary.
+    """
+    natures = Counter()
+    brands = Counter()
+    price_ranges = Counter()
+    sizes = Counter()
+    categories = {}
+    low = high = None
+
+    for product in products:
+        nature = product.get("nature") or "Other"
+        brand = product.get("brand")
+        price = _price(product)
+        natures[nature] += 1
+        category = categories.setdefault(nature, {"count": 0, "min_price": None, "max_price": None, "brands": Counter()})
+        category["count"] += 1
+        if brand:
+            brands[brand] += 1
+            category["brands"][brand] += 1
+        if price is not None:
+            price_ranges[_bucket_label(price)] += 1
+            low = price if low is None else min(low, price)
+            high = price if high is None else max(high, price)
+            category["min_price"] = price if category["min_price"] is None else min(category["min_price"], price)
+            category["max_price"] = price if category["max_price"] is None else max(category["max_price"], price)
+        # Sizes count the products available in them, not models listing them twice
+        for size in set(product.get("capacity") or []):
+            sizes[size] += 1
+
+    bucket_order = [_bucket_label(lower) for lower in (0,) + PRICE_BUCKETS]
+    return {
+        "total": len(products),
+        "nature": [{"value": value, "count": count} for value, count in natures.most_common()],
+        "brand": [{"value": value, "count": count} for value, count in brands.most_common()],
+        "price": {
+            "min": low,
+            "max": high,
+            "ranges": [{"value": label, "count": price_ranges[label]} for label in bucket_order if price_ranges[label]],
+        },
+        "size": [{"value": value, "count": count} for value, count in sizes.most_common()],
+        "categories": {
+            nature: {**category, "brands": [brand for brand, _ in category["brands"].most_common(3)]}
+            for nature, category in categories.items()
+        },
+    }
+
+def _format_price(price: float) -> str:
+    return f"{price:.0f}" if price == int(price) else f"{price:.2f}"
+
+def _price_span(low: float | None, high: float | None) -> str:
+    if low is None:
+        return ""
+    if low == high:
+        return f", {_format_price(low)}"
+    return f", {_format_price(low)}-{_format_price(high)}"
+
+def render_summary(query: str, facets: dict, max_categories: int = 4) -> str:
+    """
+    Markdown summary in the shape the model used to write: one sentence, the
+    main categories and a recommendation, filled in from the facets.
+    """
+    natures = facets["nature"][:max_categories]
+    if not natures:
+        return f"No products found for '{query}'."
+    categories = facets["categories"]
+    names = [entry["value"] for entry in natures]
+    listed = names[0] if len(names) == 1 else ", ".join(names[:-1]) + f" and {names[-1]}"
+
+    lines = [f"Found {facets['total']} products for **{query}**, mainly {listed}.", "", "## Main Categories"]
+    for entry in natures:
+        category = categories[entry["value"]]
+        brands = f"; brands: {', '.join(category['brands'])}" if category["brands"] else ""
+        span = _price_span(category["min_price"], category["max_price"])
+        noun = "product" if entry["count"] == 1 else "products"
+        lines.append(f"- **{entry['value']}**: {entry['count']} {noun}{span}{brands}")
+
+    top = categories[names[0]]
+    reason = f"it has the widest choice ({natures[0]['count']} of {facets['total']} results)"
+    if top["min_price"] is not None:
+        reason += f", starting at {_format_price(top['min_price'])}"
+    lines += ["", "## Recommendation", f"Start with **{names[0]}**: {reason}."]
+
+    sizes = [entry["value"] for entry in facets["size"][:8]]
+    if sizes:
+        lines.append(f"Available sizes include {', '.join(sizes)}.")
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+# backend/services/fake_model.py
+"""
+Local stand-in for GenerativeModel, enabled with GENUI_FAKE_MODEL=1.
+Answers with canned text after a fixed latency and enforces a quota the way
+Vertex does, so admission control can be exercised without cloud access.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# GENUI_FAKE_MODEL_LATENCY: seconds per call.
+# GENUI_FAKE_MODEL_MAX_CONCURRENT / GENUI_FAKE_MODEL_RPM: quota; exceeding it raises FakeQuotaExceeded.
+FAKE_LATENCY = float(os.getenv("GENUI_FAKE_MODEL_LATENCY", "0.3"))
+FAKE_MAX_CONCURRENT = int(os.getenv("GENUI_FAKE_MODEL_MAX_CONCURRENT", "8"))
+FAKE_RPM = int(os.getenv("GENUI_FAKE_MODEL_RPM", "600"))
+
+PRODUCT_WORDS = ("buy", "find", "show", "search", "shoes", "tent", "backpack", "bike", "jacket")
+
+class FakeQuotaExceeded(Exception):
+    """Mirrors the 429 ResourceExhausted error Vertex raises on quota."""
+    code = 429
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+def _classify(query: str) -> str:
+    # Whole words, so e.g. "intent" does not count as "tent"
+    words = set(re.findall(r"[a-z]+", query.lower()))
+    if "compare" in words:
+        return "compare"
+    if words & {"return", "returns", "refund", "warranty"}:
+        return "reassure"
+    if words & set(PRODUCT_WORDS):
+        return "find_product"
+    return "chitchat"
+
+class FakeModel:
+    def __init__(self, latency: float = FAKE_LATENCY, max_concurrent: int = FAKE_MAX_CONCURRENT, rpm: int = FAKE_RPM):
+        self.latency = latency
+        self.max_concurrent = max_concurrent
+        self.rpm = rpm
+        self.in_flight = 0
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def _admit(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] > 60:
+                self.calls.popleft()
+            if self.in_flight >= self.max_concurrent or len(self.calls) >= self.rpm:
+                raise FakeQuotaExceeded("429 Quota exceeded for gemini fake model")
+            self.in_flight += 1
+            self.calls.append(now)
+
+    def _done(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def _answer(self, prompt: str, generation_config=None) -> str:
+        if generation_config and generation_config.get("response_mime_type") == "application/json":
+            queries = re.findall(r"^\d+\. (.*)$", prompt, flags=re.MULTILINE)
+            return json.dumps([_classify(json.loads(q)) for q in queries])
+        if prompt.rstrip().endswith("Intent:"):
+            return _classify(prompt.rstrip().rsplit("User:", 1)[-1].rsplit("Intent:", 1)[0])
+        if "sub-queries" in prompt:
+            return prompt.split("Query:", 1)[-1].split("\n", 1)[0].strip()
+        return "This is a canned answer from the fake model."
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None):
+        self._admit()
+        try:
+            time.sleep(self.latency)
+            text = self._answer(prompt, generation_config)
+        finally:
+            self._done()
+        return iter([FakeResponse(text)]) if stream else FakeResponse(text)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, generation_config=None):
+        self._admit()
+        try:
+            await asyncio.sleep(self.latency)
+            text = self._answer(prompt, generation_config)
+        finally:
+            self._done()
+        if not stream:
+            return FakeResponse(text)
+
+        async def chunks():
+            for word in text.split(" "):
+                yield FakeResponse(word + " ")
+        return chunks()
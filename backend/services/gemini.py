@@ -1,11 +1,94 @@
 # backend/services/gemini.py
-from vertexai.generative_models import GenerativeModel
+from backend.services.fake_model import FakeModel, FakeQuotaExceeded
+from backend.services.scheduler import scheduler, current_intent, effective_priority, ModelOverloaded
+from backend.services.cache import intent_cache, normalize_query
 import logging
 import json
 import asyncio
+import os
+import threading
 
 logger = logging.getLogger("main")
-model = GenerativeModel("gemini-2.0-flash-001")
+
+MODEL_NAME = "gemini-2.0-flash-001"
+
+# GENUI_FAKE_MODEL: use the local quota-enforcing FakeModel instead of Vertex
+USE_FAKE_MODEL = os.getenv("GENUI_FAKE_MODEL", "0") == "1"
+
+_model = None
+_model_lock = threading.Lock()
+
+def preload_sdk():
+    """
+    Imports the Vertex SDK without creating a client.
+    Meant to run in a pre-fork master so workers share the imported modules;
+    the gRPC client itself is only built after fork, in get_model().
+    """
+    import vertexai.generative_models  # noqa: F401
+
+def get_model():
+    """
+    Returns the shared GenerativeModel, building it on first use.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None and USE_FAKE_MODEL:
+                logger.info("🧪 Using fake model")
+                _model = FakeModel()
+            elif _model is None:
+                from vertexai.generative_models import GenerativeModel
+                logger.info(f"🧠 Initializing Gemini client: {MODEL_NAME}")
+                _model = GenerativeModel(MODEL_NAME)
+    return _model
+
+def reset_model():
+    """
+    Drops the shared client so the next call rebuilds it.
+    Registered as an after-fork hook: gRPC channels must not cross a fork.
+    """
+    global _model, _model_lock
+    _model = None
+    _model_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_model)
+
+def _is_quota_error(e: Exception) -> bool:
+    if isinstance(e, FakeQuotaExceeded):
+        return True
+    try:
+        from google.api_core.exceptions import ResourceExhausted
+    except ImportError:
+        return False
+    return isinstance(e, ResourceExhausted)
+
+def generate_content(prompt: str, priority: str = None, **kwargs):
+    """
+    Every blocking model call goes through here so the scheduler can admit,
+    prioritize or shed it. Quota errors become ModelOverloaded.
+    """
+    with scheduler.slot(effective_priority(priority), current_intent.get()):
+        try:
+            return get_model().generate_content(prompt, **kwargs)
+        except Exception as e:
+            if _is_quota_error(e):
+                scheduler.record_quota_error()
+                raise ModelOverloaded(f"Model quota exhausted: {e}") from e
+            raise
+
+async def generate_content_stream(prompt: str, priority: str = None):
+    """Streaming counterpart of generate_content; holds one slot for the whole stream."""
+    async with scheduler.aslot(effective_priority(priority), current_intent.get()):
+        try:
+            response = await get_model().generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                yield chunk
+        except Exception as e:
+            if _is_quota_error(e):
+                scheduler.record_quota_error()
+                raise ModelOverloaded(f"Model quota exhausted: {e}") from e
+            raise
 
 examples = [
     {"query": "hi", "intent": "chitchat"},
@@ -15,6 +98,11 @@ examples = [
 ]
 
 def detect_intent(query: str) -> str:
+    cached = intent_cache.get(normalize_query(query))
+    if cached:
+        logger.info(f"🎯 Cached intent for query: {query}: {cached}")
+        return cached
+
     prompt = """
 Classify the intent of the user's query:
 - find_product
@@ -30,15 +118,77 @@ Respond with one intent label only.
 
     logger.info(f"🔍 Gemini intent detection for query: {query}")
     try:
-        response = model.generate_content(prompt)
+        response = generate_content(prompt, "intent")
         intent = response.text.strip().lower()
         logger.info(f"🎯 Detected intent: {intent}")
+        intent_cache.set(normalize_query(query), intent)
         return intent
+    except ModelOverloaded:
+        raise
     except Exception as e:
         logger.error(f"❌ Gemini intent detection failed: {e}")
         return "chitchat"
 
-def generate_response(query: str, products=None) -> str:
+INTENTS = ["find_product", "compare", "reassure", "chitchat"]
+
+# Queries classified per Gemini call by detect_intents_batch
+BATCH_INTENT_SIZE = 50
+
+def detect_intents_batch(queries: list[str]) -> list[str]:
+    """
+    Classifies many queries in one Gemini call using a JSON array response.
+    Shares intent_cache with detect_intent: cached queries are not sent, new
+    labels are cached. Falls back to per-query detect_intent if the batch call
+    fails or returns a result of the wrong shape.
+    """
+    intents = [intent_cache.get(normalize_query(query)) for query in queries]
+    missing = [query for query, intent in zip(queries, intents) if not intent]
+    if not missing:
+        logger.info(f"🎯 Cached intents for all {len(queries)} batch queries")
+        return intents
+
+    prompt = """
+Classify the intent of each numbered user query:
+- find_product
+- compare
+- reassure
+- chitchat
+
+Respond with a JSON array holding exactly one intent label per query, in the same order.
+
+Examples:
+"""
+    for ex in examples:
+        prompt += f"User: {ex['query']}\nIntent: {ex['intent']}\n"
+    prompt += "\nQueries:\n"
+    for i, query in enumerate(missing, start=1):
+        prompt += f"{i}. {json.dumps(query)}\n"
+
+    logger.info(f"🔍 Gemini batch intent detection for {len(missing)} of {len(queries)} queries")
+    try:
+        response = generate_content(
+            prompt,
+            "batch",
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": {"type": "array", "items": {"type": "string", "enum": INTENTS}},
+            },
+        )
+        labels = [str(intent).strip().lower() for intent in json.loads(response.text)]
+        if len(labels) != len(missing):
+            raise ValueError(f"expected {len(missing)} labels, got {len(labels)}")
+        logger.info(f"🎯 Detected batch intents: {labels}")
+        for query, label in zip(missing, labels):
+            intent_cache.set(normalize_query(query), label)
+    except ModelOverloaded:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Gemini batch intent detection failed, falling back to single calls: {e}")
+        labels = [detect_intent(query) for query in missing]
+    fill = iter(labels)
+    return [intent or next(fill) for intent in intents]
+
+def generate_response(query: str, products=None, priority: str = None) -> str:
     try:
         if products:
             prompt = (
@@ -61,7 +211,7 @@ def generate_response(query: str, products=None) -> str:
             logger.info(f"🔍 Comparison prompt: {prompt}")
             
             # Get the raw response
-            response = model.generate_content(prompt)
+            response = generate_content(prompt, priority)
             text = response.text.strip()
             logger.info(f"✨ Raw Gemini response: {text}")
             
@@ -85,9 +235,11 @@ def generate_response(query: str, products=None) -> str:
                 "You are a helpful sports retailer ecom assistant, stay on topic, introduce yourself only when needed. Respond to: "
                 f"{query}"
             )
-            response = model.generate_content(prompt)
+            response = generate_content(prompt, priority)
             return response.text.strip()
             
+    except ModelOverloaded:
+        raise
     except Exception as e:
         logger.error(f"❌ Gemini response generation failed: {e}")
         return json.dumps({
@@ -120,8 +272,7 @@ async def generate_stream_response(query: str, products=None):
             
             logger.info(f"🔍 Streaming comparison prompt: {prompt}")
             
-            response = model.generate_content(prompt, stream=True)
-            async for chunk in response:
+            async for chunk in generate_content_stream(prompt):
                 if hasattr(chunk, 'text') and chunk.text:
                     yield chunk.text
 
@@ -130,11 +281,12 @@ async def generate_stream_response(query: str, products=None):
                 "You are a helpful sports retailer ecom assistant. Respond to: "
                 f"{query}"
             )
-            response = model.generate_content(prompt, stream=True)
-            async for chunk in response:
+            async for chunk in generate_content_stream(prompt):
                 if hasattr(chunk, 'text') and chunk.text:
                     yield chunk.text
             
+    except ModelOverloaded:
+        raise
     except Exception as e:
         logger.error(f"❌ Gemini streaming response failed: {e}")
         yield "[ERROR] Failed to generate streaming response"
@@ -1,5 +1,6 @@
 # backend/services/intent.py
-from vertexai.generative_models import GenerativeModel
+from backend.services.gemini import generate_content
+from backend.services.scheduler import ModelOverloaded
 import logging
 
 logger = logging.getLogger("main")
@@ -13,8 +14,6 @@ examples = [
     {"query": "can I return this product?", "intent": "reassure"},
 ]
 
-model = GenerativeModel("gemini-2.0-flash-001")
-
 def detect_intent(query: str) -> str:
     prompt = """
 Classify the intent of the user's query into one of the following categories:
@@ -34,10 +33,12 @@ Examples:
     logger.info(f"🔍 Gemini intent detection for query: {query}")
 
     try:
-        response = model.generate_content(prompt)
+        response = generate_content(prompt, "intent")
         intent = response.text.strip().lower()
         logger.info(f"🎯 Detected intent: {intent}")
         return intent
+    except ModelOverloaded:
+        raise
     except Exception as e:
         logger.error(f"❌ Gemini intent detection failed: {e}")
         return "chitchat"
@@ -0,0 +1,139 @@
+# backend/services/pagination.py
+from backend.services.search import fetch_products
+from backend.services.cache import TTLCache, normalize_query
+from collections import Counter
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger("main")
+
+# GENUI_CURSOR_TTL: seconds a result cursor stays usable after its last page.
+# GENUI_MAX_DEPTH: most products fetched per sub-query when paging deeper.
+CURSOR_TTL = float(os.getenv("GENUI_CURSOR_TTL", "600"))
+MAX_DEPTH = int(os.getenv("GENUI_MAX_DEPTH", "100"))
+MAX_PAGE_SIZE = 50
+
+def _product_key(product: dict) -> str:
+    return product.get("url") or product.get("title", "")
+
+def fuse_products(products: list[dict]) -> list[dict]:
+    """
+    Merges sub-query results into one list: products whose title came back
+    for several sub-queries first, otherwise in first-seen order, deduped by URL.
+    """
+    counts = Counter(product["title"] for product in products)
+    unique = {}
+    for product in products:
+        unique.setdefault(_product_key(product), product)
+    return sorted(unique.values(), key=lambda product: -counts[product["title"]])
+
+class ResultCursor:
+    """
+    Server-side state behind an opaque cursor: the fused result list and how
+    deep each sub-query has been fetched so far.
+    """
+
+    def __init__(self, sub_queries: list[str], products: list[dict], depth: int):
+        self.sub_queries = sub_queries
+        self.products = products
+        self.seen = {_product_key(product) for product in products}
+        self.depth = depth
+        self.exhausted = False
+        self.lock = threading.Lock()
+
+    def deepen(self):
+        """Fetches the sub-queries deeper and appends the products not seen yet."""
+        if self.depth >= MAX_DEPTH:
+            self.exhausted = True
+            return
+        self.depth = min(self.depth * 2, MAX_DEPTH)
+        fetched = []
+        for sub_query in self.sub_queries:
+            fetched.extend(fetch_products(sub_query, max_items=self.depth))
+        added = [product for product in fuse_products(fetched) if _product_key(product) not in self.seen]
+        logger.info(f"📑 Cursor deepened to {self.depth} per sub-query, {len(added)} new products")
+        if not added:
+            self.exhausted = True
+        self.products.extend(added)
+        self.seen.update(_product_key(product) for product in added)
+
+_cursors = TTLCache("cursors", ttl=CURSOR_TTL)
+
+def _encode(cursor_id: str, offset: int) -> str:
+    raw = json.dumps({"c": cursor_id, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode(token: str) -> tuple[str, int] | None:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        cursor_id, offset = str(raw["c"]), int(raw["o"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    return (cursor_id, offset) if offset >= 0 else None
+
+def clamp_page_size(page_size) -> int | None:
+    """
+    Validates a client page size and clamps it to 1..MAX_PAGE_SIZE.
+    Raises ValueError for anything but an integer.
+    """
+    if page_size is None:
+        return None
+    if isinstance(page_size, bool) or not isinstance(page_size, (int, str)):
+        raise ValueError(f"page_size must be an integer, got {page_size!r}")
+    try:
+        page_size = int(page_size)
+    except ValueError:
+        raise ValueError(f"page_size must be an integer, got {page_size!r}") from None
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+def _cursor_id(query: str, page_size: int) -> str:
+    # Derived from the search rather than random, so repeating a search yields
+    # the same cursor tokens and an unchanged first page keeps its ETag
+    key = f"{normalize_query(query)}\n{page_size}".encode()
+    return base64.urlsafe_b64encode(hashlib.sha256(key).digest()[:12]).decode()
+
+def open_cursor(query: str, sub_queries: list[str], products: list[dict], depth: int, page_size: int) -> tuple[list[dict], str | None]:
+    """
+    Stores the fused result list and returns (first page, cursor for the next page).
+    Cursors are shared by everyone running the same search: a live cursor whose
+    first page is unchanged is kept, with whatever deeper pages it already
+    fetched; otherwise the stored list is replaced under the same cursor.
+    """
+    cursor_id = _cursor_id(query, page_size)
+    existing = _cursors.get(cursor_id)
+    if existing is not None:
+        with existing.lock:
+            unchanged = existing.products[:page_size] == products[:page_size]
+        if unchanged:
+            _cursors.set(cursor_id, existing)
+            return existing.products[:page_size], _encode(cursor_id, page_size)
+    cursor = ResultCursor(sub_queries, products, depth)
+    _cursors.set(cursor_id, cursor)
+    return cursor.products[:page_size], _encode(cursor_id, page_size)
+
+def read_page(token: str, page_size: int) -> tuple[list[dict], str | None] | None:
+    """
+    Returns (page, next cursor) for a cursor token, fetching deeper upstream only
+    when the cached list runs out. None if the token is invalid or expired.
+    Blocking; call from a worker thread.
+    """
+    decoded = _decode(token)
+    if decoded is None:
+        return None
+    cursor_id, offset = decoded
+    cursor = _cursors.get(cursor_id)
+    if cursor is None:
+        return None
+
+    with cursor.lock:
+        while len(cursor.products) < offset + page_size and not cursor.exhausted:
+            cursor.deepen()
+        page = cursor.products[offset:offset + page_size]
+        more = len(cursor.products) > offset + page_size or not cursor.exhausted
+    # Refresh the TTL so an actively browsed cursor does not expire mid-session
+    _cursors.set(cursor_id, cursor)
+    return page, _encode(cursor_id, offset + page_size) if page and more else None
@@ -1,4 +1,36 @@
 # backend/services/products.py
+from backend.services.stream_json import JsonStreamReader
+from typing import Iterable
+
+def extract_item_products(product: dict) -> list[dict]:
+    """
+    Flattens one search result item into one product dict per model.
+    """
+    models = product.get("models", [])
+    brand = product.get("brand", {}).get("label", "")
+    nature = product.get("natureLabel", "")
+    fallback_url = product.get("url", "")
+    fallback_title = product.get("webLabel", "")
+
+    products = []
+    for model in models:
+        title = model.get("webLabel") or fallback_title or "Untitled"
+        image = model.get("image", {}).get("url", "")
+        price = model.get("price", "")
+        url = model.get("url", fallback_url)
+        sizes = model.get("availableSizes", [])
+
+        products.append({
+            "title": title,
+            "price": price,
+            "image": image,
+            "url": url,
+            "brand": brand,
+            "nature": nature,
+            "capacity": sizes,
+        })
+    return products
+
 def extract_products_from_response(search_response: dict, max_items: int = 10, include_metadata: bool = False) -> list | tuple:
     """
     Extracts product list from the nested search response.
@@ -9,30 +41,66 @@ def extract_products_from_response(search_response: dict, max_items: int = 10, i
     metadata = search_response.get("stats", {}).get("llm_output", {}) if include_metadata else {}
 
     for product in items:
-        models = product.get("models", [])
-        brand = product.get("brand", {}).get("label", "")
-        nature = product.get("natureLabel", "")
-        fallback_url = product.get("url", "")
-        fallback_title = product.get("webLabel", "")
-
-        for model in models:
-            title = model.get("webLabel") or fallback_title or "Untitled"
-            image = model.get("image", {}).get("url", "")
-            price = model.get("price", "")
-            url = model.get("url", fallback_url)
-            sizes = model.get("availableSizes", [])
-
-            products.append({
-                "title": title,
-                "price": price,
-                "image": image,
-                "url": url,
-                "brand": brand,
-                "nature": nature,
-                "capacity": sizes,
-            })
-
-            if len(products) >= max_items:
-                return (products, metadata) if include_metadata else products
+        products.extend(extract_item_products(product))
+        if len(products) >= max_items:
+            products = products[:max_items]
+            break
 
     return (products, metadata) if include_metadata else products
+
+def _walk_items(reader: JsonStreamReader, products: list, max_items: int, drain: bool) -> int:
+    # Consumes data.blocks.items until max_items products are collected, then
+    # either stops mid-stream or, with drain, skips to the end of "data".
+    # Returns the number of raw item blocks decoded.
+    blocks = 0
+    for key in reader.object_keys():
+        if key != "blocks" or reader.peek() != "{":
+            reader.skip_value()
+            continue
+        for block_key in reader.object_keys():
+            if block_key != "items" or reader.peek() != "[":
+                reader.skip_value()
+                continue
+            for _ in reader.array_items():
+                if len(products) >= max_items:
+                    if not drain:
+                        return blocks
+                    reader.skip_value()
+                    continue
+                item = reader.read_value()
+                blocks += 1
+                if isinstance(item, dict):
+                    products.extend(extract_item_products(item))
+    return blocks
+
+def parse_search_stream(chunks: Iterable[bytes], max_items: int = 10, include_metadata: bool = False) -> tuple[list, dict, int]:
+    """
+    Streaming counterpart of extract_products_from_response.
+    Decodes result items one at a time and stops reading as soon as max_items
+    products are collected and, if requested, stats.llm_output has been seen.
+    Returns (products, metadata, raw item blocks decoded).
+    """
+    reader = JsonStreamReader(chunks)
+    products = []
+    metadata = {}
+    blocks = 0
+    need_items, need_metadata = True, include_metadata
+
+    for key in reader.object_keys():
+        if key == "data" and need_items and reader.peek() == "{":
+            # If stats may still follow, the rest of "data" has to be skipped over
+            blocks = _walk_items(reader, products, max_items, drain=need_metadata)
+            need_items = False
+        elif key == "stats" and need_metadata and reader.peek() == "{":
+            for stats_key in reader.object_keys():
+                if stats_key == "llm_output":
+                    metadata = reader.read_value() or {}
+                    need_metadata = False
+                else:
+                    reader.skip_value()
+        else:
+            reader.skip_value()
+        if not need_items and not need_metadata:
+            break
+
+    return products[:max_items], metadata, blocks
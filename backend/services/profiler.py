@@ -0,0 +1,242 @@
+# backend/services/profiler.py
+from collections import Counter
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger("main")
+
+# GENUI_PROFILE_DIR: where captured profiles are written.
+# GENUI_PROFILE_SAMPLE_RATE: fraction of requests profiled without the X-Profile header.
+# GENUI_PROFILE_INTERVAL_MS: time between stack samples.
+# GENUI_PROFILE_TOKEN: secret a client sends as "X-Profile: <token>" to profile a request
+#   or read /profiles. Unset (the default), the header is ignored and /profiles is off.
+# GENUI_PROFILE_MAX_ACTIVE: profilers running at once per worker; further requests run unprofiled.
+# GENUI_PROFILE_KEEP: profile files kept in GENUI_PROFILE_DIR; the oldest are deleted.
+PROFILE_DIR = os.getenv("GENUI_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("GENUI_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("GENUI_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_TOKEN = os.getenv("GENUI_PROFILE_TOKEN", "")
+PROFILE_MAX_ACTIVE = int(os.getenv("GENUI_PROFILE_MAX_ACTIVE", "2"))
+PROFILE_KEEP = int(os.getenv("GENUI_PROFILE_KEEP", "50"))
+PROFILE_HEADER = b"x-profile"
+PROFILE_NAME = re.compile(r"^[\w.-]+\.collapsed$")
+
+# Leaf frames of threads parked with nothing to do (event loop select, idle
+# executor workers); their samples would only bury the interesting stacks.
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+_IDLE_FUNCTIONS = {("thread.py", "_worker")}
+
+def _is_idle(frame) -> bool:
+    filename = os.path.basename(frame.f_code.co_filename)
+    return filename in _IDLE_FILES or (filename, frame.f_code.co_name) in _IDLE_FUNCTIONS
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _collapse(frames) -> str:
+    return ";".join(_frame_label(frame) for frame in frames)
+
+def _thread_frames(frame) -> list:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+def _await_frames(coro) -> list:
+    # Task.get_stack only returns the outermost frame of a suspended coroutine,
+    # so follow the await chain down to the innermost awaited coroutine
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for one request.
+
+    A background thread periodically records the stack of every busy thread
+    (the event loop and the to_thread workers running Gemini and Search calls)
+    plus the await chain of the request's asyncio task, so time spent suspended
+    in route_intent and the intent handlers shows up too. Samples are kept as
+    collapsed stacks ("frame;frame;frame count"), the flamegraph.pl input format.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, task: asyncio.Task | None = None):
+        self.interval = interval
+        self.task = task
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        self.sample_count += 1
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self._thread.ident:
+                continue
+            if _is_idle(frame):
+                continue
+            stack = _collapse(_thread_frames(frame))
+            self.samples[f"thread:{names.get(ident, ident)};{stack}"] += 1
+        if self.task is not None and not self.task.done():
+            stack = _collapse(_await_frames(self.task.get_coro()))
+            if stack:
+                self.samples[f"task:{self.task.get_name()};{stack}"] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def profile_authorized(token: str | bytes | None) -> bool:
+    """True if token matches GENUI_PROFILE_TOKEN; always False when none is configured."""
+    if not PROFILE_TOKEN or not token:
+        return False
+    if isinstance(token, bytes):
+        token = token.decode("latin-1")
+    return hmac.compare_digest(token.strip(), PROFILE_TOKEN)
+
+def should_profile(headers: list[tuple[bytes, bytes]]) -> bool:
+    for name, value in headers:
+        if name.lower() == PROFILE_HEADER and profile_authorized(value):
+            return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def profile_name(method: str, path: str) -> str:
+    slug = re.sub(r"[^\w]+", "_", path).strip("_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{method.lower()}-{slug}-{os.getpid()}-{random.randrange(1 << 16):04x}.collapsed"
+
+def save_profile(profiler: SamplingProfiler, name: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, name), "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    prune_profiles()
+
+def prune_profiles(keep: int = PROFILE_KEEP):
+    """Deletes all but the newest keep profiles."""
+    for profile in list_profiles()[keep:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, profile["name"]))
+        except OSError:
+            pass  # already removed by another worker
+
+def list_profiles() -> list[dict]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if PROFILE_NAME.match(name):
+            stat = os.stat(os.path.join(PROFILE_DIR, name))
+            profiles.append({"name": name, "bytes": stat.st_size, "created": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+def profile_path(name: str) -> str | None:
+    """Resolves a profile name to its file, refusing anything outside PROFILE_DIR."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+def collapsed_to_speedscope(name: str, collapsed: str) -> dict:
+    """Converts collapsed stacks to a speedscope "sampled" profile."""
+    frames, index, samples, weights = [], {}, [], []
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        sample = []
+        for label in stack.split(";"):
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(int(count))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "none",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "genui-backend",
+    }
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that send "X-Profile: <GENUI_PROFILE_TOKEN>"
+    (or are picked by GENUI_PROFILE_SAMPLE_RATE). The profile covers the whole
+    response, streamed bodies included, and its name is returned in X-Profile-Id.
+    At most max_active requests are profiled at once.
+    """
+
+    def __init__(self, app, max_active: int = PROFILE_MAX_ACTIVE):
+        self.app = app
+        self.max_active = max_active
+        self.active = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/profiles") or not should_profile(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        if self.active >= self.max_active:
+            logger.info(f"🔬 Not profiling {scope['path']}: {self.active} profiles already running")
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        # Named up front so the ID can go out with the response headers
+        name = profile_name(method, path)
+        profiler = SamplingProfiler(task=asyncio.current_task())
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", name.encode())]}
+            await send(message)
+
+        start = time.perf_counter()
+        self.active += 1
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            seconds = time.perf_counter() - start
+            # Joining the sampler may wait out a sample in progress; keep that off the loop
+            await asyncio.to_thread(profiler.stop)
+            self.active -= 1
+            if profiler.samples:
+                await asyncio.to_thread(save_profile, profiler, name)
+                logger.info(f"🔬 Profiled {method} {path} ({seconds * 1000:.0f} ms, {profiler.sample_count} samples): {name}")
+            else:
+                # Too fast to catch a sample; an empty file would only clutter /profiles
+                logger.info(f"🔬 Profiled {method} {path} ({seconds * 1000:.0f} ms): no samples, nothing saved")
@@ -0,0 +1,209 @@
+# backend/services/scheduler.py
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("main")
+
+# Lower number runs first
+PRIORITIES = {"intent": 0, "interactive": 1, "summary": 2, "batch": 3}
+
+# Ambient context for model calls: the routed intent (for per-intent limits) and a
+# priority floor, e.g. "batch" for everything issued on behalf of /chat/batch.
+# asyncio.to_thread copies the context, so worker-thread calls inherit both.
+current_intent: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_intent", default=None)
+call_priority: contextvars.ContextVar[str] = contextvars.ContextVar("call_priority", default="interactive")
+
+def _parse_limits(raw: str) -> dict[str, int]:
+    limits = {}
+    for part in raw.split(","):
+        if "=" in part:
+            intent, limit = part.split("=", 1)
+            limits[intent.strip()] = int(limit)
+    return limits
+
+# GENUI_LLM_MAX_CONCURRENCY: model calls in flight across the worker.
+# GENUI_LLM_INTENT_LIMITS: per-intent caps, e.g. "find_product=8,chitchat=4".
+# GENUI_LLM_MAX_QUEUE_WAIT: seconds a call may wait for a slot before it is shed.
+# GENUI_LLM_MAX_QUEUE_DEPTH: waiting calls beyond this are shed immediately.
+MAX_CONCURRENCY = int(os.getenv("GENUI_LLM_MAX_CONCURRENCY", "16"))
+INTENT_LIMITS = _parse_limits(os.getenv("GENUI_LLM_INTENT_LIMITS", ""))
+MAX_QUEUE_WAIT = float(os.getenv("GENUI_LLM_MAX_QUEUE_WAIT", "2.0"))
+MAX_QUEUE_DEPTH = int(os.getenv("GENUI_LLM_MAX_QUEUE_DEPTH", "200"))
+
+class ModelOverloaded(Exception):
+    """
+    Raised when a model call is shed: the queue is full, the queue-time limit
+    passed, or the model reported its quota exhausted. Surfaces as a 503.
+    """
+
+class _Waiter:
+    __slots__ = ("priority", "intent", "enqueued", "granted", "abandoned", "notify")
+
+    def __init__(self, priority: int, intent: str | None, notify):
+        self.priority = priority
+        self.intent = intent
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.abandoned = False
+        self.notify = notify
+
+class ModelScheduler:
+    """
+    Admission control for model calls.
+    Enforces a global and per-intent concurrency limit, grants slots by priority
+    (FIFO within a priority) and sheds calls that would queue too long.
+    Usable from worker threads (slot) and from the event loop (aslot).
+    """
+
+    def __init__(self, max_concurrency: int, intent_limits: dict[str, int], max_queue_wait: float, max_queue_depth: int):
+        self.max_concurrency = max_concurrency
+        self.intent_limits = intent_limits
+        self.max_queue_wait = max_queue_wait
+        self.max_queue_depth = max_queue_depth
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._queued = 0
+        self._running = 0
+        self._running_by_intent: dict[str, int] = {}
+        self._waits = deque(maxlen=1000)
+        self._counters = {"granted": 0, "shed_queue_full": 0, "shed_timeout": 0, "quota_errors": 0}
+
+    def _has_room(self, intent: str | None) -> bool:
+        limit = self.intent_limits.get(intent)
+        return limit is None or self._running_by_intent.get(intent, 0) < limit
+
+    def _dispatch(self):
+        # Called with the lock held: grant slots to the best waiters that fit
+        skipped = []
+        while self._heap and self._running < self.max_concurrency:
+            entry = heapq.heappop(self._heap)
+            waiter = entry[2]
+            if waiter.abandoned:
+                continue
+            if not self._has_room(waiter.intent):
+                skipped.append(entry)
+                continue
+            self._queued -= 1
+            self._running += 1
+            if waiter.intent:
+                self._running_by_intent[waiter.intent] = self._running_by_intent.get(waiter.intent, 0) + 1
+            waiter.granted = True
+            self._counters["granted"] += 1
+            self._waits.append(time.monotonic() - waiter.enqueued)
+            waiter.notify()
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+
+    def _enqueue(self, priority: str, intent: str | None, notify) -> _Waiter:
+        # Called with the lock held
+        waiter = _Waiter(PRIORITIES.get(priority, PRIORITIES["interactive"]), intent, notify)
+        if self._queued >= self.max_queue_depth:
+            self._counters["shed_queue_full"] += 1
+            raise ModelOverloaded("Model queue is full")
+        heapq.heappush(self._heap, (waiter.priority, next(self._seq), waiter))
+        self._queued += 1
+        self._dispatch()
+        return waiter
+
+    def _abandon(self, waiter: _Waiter):
+        # Called with the lock held; the heap entry is dropped lazily by _dispatch
+        waiter.abandoned = True
+        self._queued -= 1
+        self._counters["shed_timeout"] += 1
+
+    def _release(self, intent: str | None):
+        with self._lock:
+            self._running -= 1
+            if intent:
+                self._running_by_intent[intent] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: str = "interactive", intent: str | None = None):
+        """Blocks the calling thread until a slot is granted."""
+        with self._lock:
+            waiter = self._enqueue(priority, intent, self._cond.notify_all)
+            deadline = waiter.enqueued + self.max_queue_wait
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._abandon(waiter)
+                    raise ModelOverloaded(f"Waited over {self.max_queue_wait}s for a model slot")
+                self._cond.wait(remaining)
+        try:
+            yield
+        finally:
+            self._release(intent)
+
+    @asynccontextmanager
+    async def aslot(self, priority: str = "interactive", intent: str | None = None):
+        """Awaits a slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+
+        with self._lock:
+            waiter = self._enqueue(priority, intent, notify)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self.max_queue_wait)
+        except BaseException as e:
+            with self._lock:
+                lost_grant = waiter.granted
+                if not lost_grant:
+                    self._abandon(waiter)
+            if lost_grant:
+                self._release(intent)
+            if isinstance(e, asyncio.TimeoutError):
+                raise ModelOverloaded(f"Waited over {self.max_queue_wait}s for a model slot") from None
+            raise
+        try:
+            yield
+        finally:
+            self._release(intent)
+
+    def under_load(self) -> bool:
+        """True when every slot is taken or calls are already waiting for one."""
+        with self._lock:
+            return self._queued > 0 or self._running >= self.max_concurrency
+
+    def record_quota_error(self):
+        with self._lock:
+            self._counters["quota_errors"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "max_concurrency": self.max_concurrency,
+                "intent_limits": dict(self.intent_limits),
+                "running": self._running,
+                "running_by_intent": dict(self._running_by_intent),
+                "queue_depth": self._queued,
+                **self._counters,
+            }
+        if waits:
+            stats["wait_ms_p50"] = waits[len(waits) // 2] * 1000
+            stats["wait_ms_p95"] = waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000
+            stats["wait_ms_max"] = waits[-1] * 1000
+        return stats
+
+scheduler = ModelScheduler(MAX_CONCURRENCY, INTENT_LIMITS, MAX_QUEUE_WAIT, MAX_QUEUE_DEPTH)
+
+def effective_priority(priority: str | None) -> str:
+    """The lower-priority of the explicit call priority and the ambient floor."""
+    floor = call_priority.get()
+    if priority is None:
+        return floor
+    return max(priority, floor, key=lambda p: PRIORITIES.get(p, PRIORITIES["interactive"]))
@@ -1,4 +1,6 @@
 # backend/services/search.py
+from backend.services.products import parse_search_stream
+from backend.services.cache import search_cache, normalize_query
 import requests
 import logging
 logger = logging.getLogger(__name__)
@@ -6,64 +8,64 @@ logger = logging.getLogger(__name__)
 
 SEARCH_API_URL = "http://10.60.21.248:8000/search"
 
+# Bytes read from the Search API response per incremental parse step
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Shared session so sub-query searches reuse pooled keep-alive connections.
+_session = requests.Session()
+
+def warm_connection() -> bool:
+    """
+    Opens a pooled connection to the Search API host ahead of the first query.
+    Any HTTP status counts as warm; only network failures return False.
+    """
+    try:
+        _session.head(SEARCH_API_URL, timeout=2)
+        return True
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"⚠️ Search API warm-up failed: {e}")
+        return False
+
 def fetch_products(query: str, max_items: int = 10, return_metadata: bool = False) -> list | tuple:
     """
     Queries the Decathlon Search API and returns a list of products.
     Optionally includes llm_output metadata when return_metadata is True.
+    The response body is parsed incrementally and the connection is closed as
+    soon as max_items products (and the metadata, if requested) are read.
+    Successful results are cached per (query, max_items, return_metadata).
     Logs both product results and metadata.
     """
+    cache_key = (normalize_query(query), max_items, return_metadata)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"🗃️ Cached search results for query: '{query}'")
+        results, metadata = cached
+        return (list(results), metadata) if return_metadata else list(results)
+
     try:
         logger.info(f"🔍 Sending request to Search API: {SEARCH_API_URL}")
         logger.info(f"📤 Request payload: {{'query': '{query}'}}")
 
-        response = requests.post(
+        response = _session.post(
             SEARCH_API_URL,
             headers={"Content-Type": "application/json"},
             json={"query": query},
             timeout=10,
+            stream=True,
         )
-        response.raise_for_status()
-        response_json = response.json()
-
-        logger.info(f"📥 Raw response from API: {response_json}")
+        with response:
+            response.raise_for_status()
+            results, metadata, blocks = parse_search_stream(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE), max_items, return_metadata
+            )
 
-        data = response_json.get("data", {}).get("blocks", {}).get("items", [])
-        metadata = response_json.get("stats", {}).get("llm_output", {}) if return_metadata else {}
-
-        logger.info(f"🛍️ Found {len(data)} raw product blocks from API for query: '{query}'")
+        logger.info(f"🛍️ Parsed {blocks} raw product blocks from API for query: '{query}'")
         if metadata:
             logger.info(f"📊 Metadata extracted: {metadata}")
+        for product in results:
+            logger.info(f"🧾 Parsed product: {product}")
 
-        results = []
-        for item in data:
-            models = item.get("models", [])
-            brand = item.get("brand", {}).get("label", "")
-            nature = item.get("natureLabel", "")
-            fallback_url = item.get("url", "")
-            fallback_title = item.get("webLabel", "")
-
-            for model in models:
-                title = model.get("webLabel") or fallback_title or "Untitled"
-                image = model.get("image", {}).get("url", "")
-                price = model.get("price", "")
-                url = model.get("url", fallback_url)
-                sizes = model.get("availableSizes", [])
-
-                product = {
-                    "title": title,
-                    "price": price,
-                    "image": image,
-                    "url": url,
-                    "brand": brand,
-                    "nature": nature,
-                    "capacity": sizes,
-                }
-                logger.info(f"🧾 Parsed product: {product}")
-                results.append(product)
-
-                if len(results) >= max_items:
-                    return (results, metadata) if return_metadata else results
-
+        search_cache.set(cache_key, (results, metadata))
         return (results, metadata) if return_metadata else results
 
     except requests.exceptions.RequestException as e:
@@ -0,0 +1,98 @@
+# backend/services/speculation.py
+from backend.services.search import fetch_products
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("main")
+
+# GENUI_SPECULATIVE_SEARCH: search the raw query while intent detection is in flight.
+# GENUI_SPECULATION_BUDGET_PER_MIN: max speculative Search API calls per minute, per worker.
+SPECULATIVE_SEARCH = os.getenv("GENUI_SPECULATIVE_SEARCH", "0") == "1"
+SPECULATION_BUDGET_PER_MIN = float(os.getenv("GENUI_SPECULATION_BUDGET_PER_MIN", "60"))
+
+class SpeculationBudget:
+    """
+    Token bucket capping how many speculative searches may be launched.
+    Refills continuously up to one minute's worth of budget.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+_budget = SpeculationBudget(SPECULATION_BUDGET_PER_MIN)
+_stats_lock = threading.Lock()
+# hits: results replaced a sub-query search; misses: intent was not find_product;
+# unused: find_product, but no sub-query matched the raw query;
+# failed: the search came back empty, so the sub-query was searched normally
+_stats = {"launched": 0, "hits": 0, "misses": 0, "unused": 0, "failed": 0, "over_budget": 0}
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+def start_speculative_search(query: str, max_items: int = 10) -> asyncio.Task | None:
+    """
+    Launches fetch_products for the raw query in the background.
+    Returns None when speculation is disabled or the budget is spent.
+    """
+    if not SPECULATIVE_SEARCH or not query:
+        return None
+    if not _budget.try_acquire():
+        _count("over_budget")
+        return None
+    _count("launched")
+    logger.info(f"🔮 Speculative search for: {query}")
+    return asyncio.create_task(asyncio.to_thread(fetch_products, query, max_items))
+
+def discard_speculation(task: asyncio.Task | None, reason: str = "misses"):
+    """
+    Cancels a speculative search whose results will not be used, counted under reason.
+    A cancelled search still finishes in its worker thread; only its result is dropped.
+    """
+    if task is None:
+        return
+    task.cancel()
+    _count(reason)
+
+async def use_speculation(task: asyncio.Task) -> list | None:
+    """
+    Awaits the speculative products in place of a search for the same query.
+    None if the search failed or found nothing (fetch_products reports errors
+    as an empty list), so the caller searches normally.
+    """
+    try:
+        products = await task
+    except Exception as e:
+        logger.error(f"❌ Speculative search failed: {e}")
+        products = None
+    if not products:
+        _count("failed")
+        return None
+    _count("hits")
+    return products
+
+def speculation_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    resolved = stats["hits"] + stats["misses"] + stats["unused"] + stats["failed"]
+    stats["hit_rate"] = stats["hits"] / resolved if resolved else None
+    stats["enabled"] = SPECULATIVE_SEARCH
+    stats["budget_per_min"] = SPECULATION_BUDGET_PER_MIN
+    return stats
@@ -0,0 +1,130 @@
+# backend/services/stream_json.py
+"""
+Incremental JSON walking over a stream of byte chunks.
+
+Only the values the caller asks for are decoded; everything else is skipped
+value-by-value, and the caller may stop reading at any point (e.g. once enough
+items are collected). Decoding of each value is delegated to json's C
+raw_decode, so the Python-level work is per value, not per character.
+"""
+
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+# Characters that can legally follow a complete number
+_NUMBER_END = _WHITESPACE + ",]}"
+# Drop consumed buffer text once this much has accumulated
+_COMPACT_AT = 1 << 16
+
+class JsonStreamReader:
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """Appends at least min_chars of decoded text (less at EOF); False if nothing was added."""
+        if self._eof:
+            return False
+        if self._pos >= _COMPACT_AT:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        pieces = [self._buf]
+        added = 0
+        for chunk in self._chunks:
+            self.bytes_read += len(chunk)
+            text = self._decoder.decode(chunk)
+            pieces.append(text)
+            added += len(text)
+            if added >= min_chars:
+                break
+        else:
+            text = self._decoder.decode(b"", final=True)
+            pieces.append(text)
+            added += len(text)
+            self._eof = True
+        self._buf = "".join(pieces)
+        return added > 0
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill() and self._eof:
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self._pos += 1
+
+    def read_value(self):
+        """Decodes the next complete value, reading more chunks as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # Grow the buffer geometrically before retrying so a large
+                # value is not re-scanned once per chunk
+                self._fill(max(len(self._buf) - self._pos, 1))
+                continue
+            # A number may be cut by the chunk boundary ("42." or "1e" decodes as
+            # its integer prefix); only trust it once a delimiter follows it
+            if (
+                isinstance(value, (int, float))
+                and not self._eof
+                and (end == len(self._buf) or self._buf[end] not in _NUMBER_END)
+            ):
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    skip_value = read_value
+
+    def object_keys(self) -> Iterator[str]:
+        """
+        Iterates the keys of the object at the cursor. After each key the caller
+        must consume its value (read_value, skip_value or a nested walk).
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            if self.peek() == "}":
+                self._pos += 1
+                return
+            self.expect(",")
+
+    def array_items(self) -> Iterator[None]:
+        """
+        Iterates the elements of the array at the cursor; the caller consumes
+        each element after it is yielded.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            self.expect(",")
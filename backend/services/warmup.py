@@ -0,0 +1,129 @@
+# backend/services/warmup.py
+from backend.services.gemini import get_model, detect_intent
+from backend.services.search import warm_connection, fetch_products
+from backend.services.scheduler import call_priority
+from backend.services.cache import normalize_query
+from backend.intents.find_product import decompose_query
+from collections import Counter, deque
+import asyncio
+import glob
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("main")
+
+# GENUI_QUERY_LOG: glob of log files holding the "📩 Incoming query:" lines chat_handler writes.
+# GENUI_WARMUP_TOP_N: most frequent queries to pre-compute. GENUI_WARMUP_QPS: warm-up rate limit.
+# GENUI_WARMUP_LOG_LINES: only the most recent lines across the logs are considered.
+# GENUI_EARLY_TRAFFIC_WINDOW: first N /chat requests after startup tracked for latency.
+QUERY_LOG = os.getenv("GENUI_QUERY_LOG", "")
+WARMUP_TOP_N = int(os.getenv("GENUI_WARMUP_TOP_N", "50"))
+WARMUP_QPS = float(os.getenv("GENUI_WARMUP_QPS", "1"))
+WARMUP_LOG_LINES = int(os.getenv("GENUI_WARMUP_LOG_LINES", "100000"))
+EARLY_TRAFFIC_WINDOW = int(os.getenv("GENUI_EARLY_TRAFFIC_WINDOW", "200"))
+
+QUERY_LOG_MARKER = "📩 Incoming query: "
+
+_lock = threading.Lock()
+_warmup = {"enabled": bool(QUERY_LOG), "state": "idle", "top_n": 0, "warmed": 0, "failed": 0, "seconds": None}
+_warmed_queries: set[str] = set()
+_early_latencies: list[float] = []
+_early_warm_hits = 0
+
+async def prewarm():
+    """
+    Builds the Gemini client and opens a Search API connection in the background.
+    Runs as a task from the app lifespan, so it never delays the server binding.
+    """
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(get_model)
+        await asyncio.to_thread(warm_connection)
+        logger.info(f"🔥 Pre-warm finished in {time.perf_counter() - start:.2f}s")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Pre-warm failed: {e}")
+
+def read_popular_queries(pattern: str, top_n: int, max_lines: int = WARMUP_LOG_LINES) -> list[str]:
+    """
+    Returns the top_n most frequent normalized queries among the most recent
+    max_lines query-log lines of the files matching pattern.
+    """
+    recent = deque(maxlen=max_lines)
+    for path in sorted(glob.glob(pattern), key=os.path.getmtime):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                _, marker, query = line.partition(QUERY_LOG_MARKER)
+                if marker and query.strip():
+                    recent.append(normalize_query(query))
+    return [query for query, _ in Counter(recent).most_common(top_n)]
+
+def _warm_query(query: str):
+    intent = detect_intent(query)
+    if intent == "find_product":
+        for sub_query in decompose_query(query):
+            fetch_products(sub_query)
+
+async def warm_popular_queries():
+    """
+    Pre-computes intent, decomposition and search results for the most popular
+    logged queries, rate limited to GENUI_WARMUP_QPS and at batch priority so
+    live traffic is always served first.
+    """
+    if not QUERY_LOG:
+        return
+    call_priority.set("batch")
+    start = time.perf_counter()
+    try:
+        queries = await asyncio.to_thread(read_popular_queries, QUERY_LOG, WARMUP_TOP_N)
+        with _lock:
+            _warmup.update(state="running", top_n=len(queries))
+        logger.info(f"🔥 Warming caches for {len(queries)} popular queries")
+
+        for query in queries:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(_warm_query, query)
+                with _lock:
+                    _warmup["warmed"] += 1
+                    _warmed_queries.add(query)
+            except Exception as e:
+                logger.warning(f"⚠️ Warm-up failed for '{query}': {e}")
+                with _lock:
+                    _warmup["failed"] += 1
+            await asyncio.sleep(max(0.0, 1 / WARMUP_QPS - (time.perf_counter() - started)))
+
+        with _lock:
+            _warmup.update(state="done", seconds=time.perf_counter() - start)
+        logger.info(f"🔥 Cache warm-up finished: {_warmup['warmed']}/{len(queries)} queries")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Cache warm-up failed: {e}")
+        with _lock:
+            _warmup["state"] = "failed"
+
+def record_early_request(query: str, seconds: float):
+    """Tracks latency of the first /chat and /ws requests after startup."""
+    global _early_warm_hits
+    with _lock:
+        if len(_early_latencies) >= EARLY_TRAFFIC_WINDOW:
+            return
+        _early_latencies.append(seconds)
+        if normalize_query(query) in _warmed_queries:
+            _early_warm_hits += 1
+
+def warmup_stats() -> dict:
+    with _lock:
+        stats = dict(_warmup)
+        latencies = sorted(_early_latencies)
+        stats["coverage"] = stats["warmed"] / stats["top_n"] if stats["top_n"] else None
+        stats["early_requests"] = len(latencies)
+        stats["early_warm_hit_rate"] = _early_warm_hits / len(latencies) if latencies else None
+    if latencies:
+        stats["early_p50_ms"] = latencies[len(latencies) // 2] * 1000
+        stats["early_p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    return stats
@@ -0,0 +1,72 @@
+# backend/tests/test_compression.py
+from backend.services.compression import CompressionMiddleware
+import asyncio
+import json
+import zlib
+import pytest
+
+def _run(app, accept_encoding: str | None = "gzip") -> tuple[dict, list[bytes]]:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    scope = {"type": "http", "method": "POST", "path": "/chat", "headers": headers}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(CompressionMiddleware(app)(scope, None, send))
+    start, bodies = sent[0], [message.get("body", b"") for message in sent[1:]]
+    return {name.lower(): value for name, value in start["headers"]} | {"status": start["status"]}, bodies
+
+def _app(content_type: bytes, chunks: list[bytes], status: int = 200, headers: list = ()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", content_type), *headers]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+def test_large_json_is_gzipped_and_vary_is_merged():
+    body = json.dumps({"products": [{"title": f"Tent {i}"} for i in range(100)]}).encode()
+    headers, bodies = _run(_app(b"application/json", [body], headers=[(b"vary", b"Origin")]))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+    assert zlib.decompress(b"".join(bodies), 16 + zlib.MAX_WBITS) == body
+
+@pytest.mark.parametrize("accept, content_type, body", [
+    ("gzip", b"application/json", b'{"ok": true}'),
+    ("gzip", b"image/png", b"\x89PNG" * 500),
+    (None, b"application/json", b"[" + b"1," * 1000 + b"1]"),
+], ids=["small", "not-compressible", "no-accepted-encoding"])
+def test_uncompressed_responses_still_vary_on_accept_encoding(accept, content_type, body):
+    headers, bodies = _run(_app(content_type, [body]), accept)
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert b"".join(bodies) == body
+
+def test_streamed_events_are_decodable_as_they_arrive():
+    events = [f"data: {json.dumps({'content': f'chunk {i}'})}\n\n".encode() for i in range(5)]
+    headers, bodies = _run(_app(b"text/event-stream", events + [b""]))
+    assert headers[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for event, body in zip(events, bodies):
+        assert decoder.decompress(body) == event
+
+def test_not_modified_passes_through():
+    headers, bodies = _run(_app(b"application/json", [b""], status=304, headers=[(b"etag", b'W/"abc"')]))
+    assert headers["status"] == 304
+    assert b"content-encoding" not in headers
+    assert bodies == [b""]
+
+def test_conditional_json_answers_304_for_a_matching_etag():
+    pytest.importorskip("fastapi")
+    from backend.services.etag import compute_etag, conditional_json
+
+    class FakeRequest:
+        def __init__(self, headers):
+            self.headers = headers
+
+    payload = {"products": [{"title": "Tent"}], "intent": "find_product"}
+    etag = compute_etag(payload)
+    fresh = conditional_json(FakeRequest({}), payload)
+    assert fresh.status_code == 200 and fresh.headers["etag"] == etag
+    assert conditional_json(FakeRequest({"if-none-match": etag.removeprefix("W/")}), payload).status_code == 304
+    assert conditional_json(FakeRequest({"if-none-match": 'W/"other"'}), payload).status_code == 200
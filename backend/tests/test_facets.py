@@ -0,0 +1,38 @@
+# backend/tests/test_facets.py
+from backend.services.facets import compute_facets, render_summary
+
+PRODUCTS = [
+    {"title": "Tent A", "price": 49.99, "brand": "QUECHUA", "nature": "Tent", "capacity": ["2 PERSONS", "2 PERSONS"]},
+    {"title": "Tent B", "price": "129", "brand": "FORCLAZ", "nature": "Tent", "capacity": ["3 PERSONS"]},
+    {"title": "Tent C", "price": 600, "brand": "QUECHUA", "nature": "Tent", "capacity": ["2 PERSONS"]},
+    {"title": "Bag", "price": 19.5, "brand": "QUECHUA", "nature": "Backpack", "capacity": []},
+    {"title": "Mystery", "price": "nan", "brand": "", "nature": "", "capacity": None},
+    {"title": "Infinite", "price": "inf", "brand": "FORCLAZ", "nature": "Tent"},
+]
+
+def test_facets_count_categories_brands_prices_and_sizes():
+    facets = compute_facets(PRODUCTS)
+    assert facets["total"] == 6
+    assert facets["nature"] == [{"value": "Tent", "count": 4}, {"value": "Backpack", "count": 1}, {"value": "Other", "count": 1}]
+    assert facets["brand"] == [{"value": "QUECHUA", "count": 3}, {"value": "FORCLAZ", "count": 2}]
+    # nan and inf prices are left out of the price facet
+    assert facets["price"] == {
+        "min": 19.5,
+        "max": 600,
+        "ranges": [{"value": "0-25", "count": 1}, {"value": "25-50", "count": 1}, {"value": "100-200", "count": 1}, {"value": "500+", "count": 1}],
+    }
+    # A size listed twice on one product counts once
+    assert facets["size"] == [{"value": "2 PERSONS", "count": 2}, {"value": "3 PERSONS", "count": 1}]
+    assert facets["categories"]["Tent"] == {"count": 4, "min_price": 49.99, "max_price": 600, "brands": ["QUECHUA", "FORCLAZ"]}
+
+def test_summary_is_rendered_from_facets():
+    summary = render_summary("tent", compute_facets(PRODUCTS))
+    assert summary.startswith("Found 6 products for **tent**, mainly Tent, Backpack and Other.")
+    assert "- **Tent**: 4 products, 49.99-600; brands: QUECHUA, FORCLAZ" in summary
+    assert "- **Backpack**: 1 product, 19.50; brands: QUECHUA" in summary
+    assert "- **Other**: 1 product" in summary
+    assert "Start with **Tent**: it has the widest choice (4 of 6 results), starting at 49.99." in summary
+    assert summary.endswith("Available sizes include 2 PERSONS, 3 PERSONS.")
+
+def test_empty_results_render_a_fallback():
+    assert render_summary("unicorn", compute_facets([])) == "No products found for 'unicorn'."
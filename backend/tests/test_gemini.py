@@ -0,0 +1,22 @@
+# backend/tests/test_gemini.py
+from backend.services.scheduler import ModelScheduler
+from backend.services.fake_model import FakeModel
+from backend.services.cache import TTLCache
+from backend.services import gemini
+
+def test_batch_intents_share_the_intent_cache(monkeypatch):
+    cache = TTLCache("intent-test")
+    model = FakeModel(latency=0)
+    monkeypatch.setattr(gemini, "intent_cache", cache)
+    monkeypatch.setattr(gemini, "scheduler", ModelScheduler(4, {}, 1.0, 10))
+    monkeypatch.setattr(gemini, "_model", model)
+
+    assert gemini.detect_intent("Buy  Shoes") == "find_product"
+    assert gemini.detect_intent("tell me a joke") == "chitchat"
+    assert gemini.detect_intent("what is the return policy") == "reassure"
+    assert gemini.detect_intents_batch(["buy shoes", "hi", "compare tents"]) == ["find_product", "chitchat", "compare"]
+    # Only the two uncached queries were sent in the batch call, and both are cached now
+    assert len(model.calls) == 4
+    assert cache.get("hi") == "chitchat"
+    assert gemini.detect_intents_batch(["hi", "compare  tents"]) == ["chitchat", "compare"]
+    assert len(model.calls) == 4
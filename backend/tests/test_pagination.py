@@ -0,0 +1,55 @@
+# backend/tests/test_pagination.py
+import pytest
+
+pytest.importorskip("requests")
+from backend.services import pagination
+
+def _products(prefix: str, count: int) -> list[dict]:
+    return [{"title": f"{prefix} {i}", "url": f"https://example.com/{prefix}/{i}"} for i in range(count)]
+
+def test_page_size_is_validated_and_clamped():
+    assert pagination.clamp_page_size(None) is None
+    assert pagination.clamp_page_size("5") == 5
+    assert pagination.clamp_page_size(0) == 1
+    assert pagination.clamp_page_size(10_000) == pagination.MAX_PAGE_SIZE
+    for bad in ("ten", True, [3], {"n": 1}):
+        with pytest.raises(ValueError):
+            pagination.clamp_page_size(bad)
+
+def test_repeated_search_returns_the_same_cursor():
+    first = pagination.open_cursor("Trail  Shoes", ["trail shoes"], _products("a", 6), 5, 3)
+    again = pagination.open_cursor("trail shoes", ["trail shoes"], _products("a", 6), 5, 3)
+    assert first == again
+
+def test_pages_deepen_upstream_only_when_the_cache_runs_out(monkeypatch):
+    fetches = []
+
+    def fetch_products(query, max_items=10):
+        fetches.append(max_items)
+        return _products(query, max_items)
+
+    monkeypatch.setattr(pagination, "fetch_products", fetch_products)
+    page, token = pagination.open_cursor("tent", ["tent"], _products("tent", 4), 4, 2)
+    assert [p["title"] for p in page] == ["tent 0", "tent 1"]
+
+    page, token = pagination.read_page(token, 2)
+    assert [p["title"] for p in page] == ["tent 2", "tent 3"]
+    assert fetches == []
+
+    page, token = pagination.read_page(token, 2)
+    assert [p["title"] for p in page] == ["tent 4", "tent 5"]
+    assert fetches == [8]
+
+    assert pagination.read_page("not-a-cursor", 2) is None
+
+    # Repeating the search keeps the deepened cursor while its first page is unchanged
+    _, token = pagination.open_cursor("tent", ["tent"], _products("tent", 4), 4, 2)
+    page, _ = pagination.read_page(pagination._encode(pagination._cursor_id("tent", 2), 6), 2)
+    assert [p["title"] for p in page] == ["tent 6", "tent 7"]
+    assert fetches == [8]
+
+    # Different results replace it
+    page, token = pagination.open_cursor("tent", ["tent"], _products("new", 4), 4, 2)
+    assert [p["title"] for p in page] == ["new 0", "new 1"]
+    page, _ = pagination.read_page(token, 2)
+    assert [p["title"] for p in page] == ["new 2", "new 3"]
@@ -0,0 +1,43 @@
+# backend/tests/test_profiler.py
+from backend.services import profiler
+import asyncio
+import functools
+import os
+
+def test_header_needs_the_configured_token(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiler, "PROFILE_TOKEN", "")
+    assert not profiler.should_profile([(b"x-profile", b"1")])
+    monkeypatch.setattr(profiler, "PROFILE_TOKEN", "s3cret")
+    assert not profiler.should_profile([(b"x-profile", b"1")])
+    assert profiler.should_profile([(b"X-Profile", b"s3cret")])
+
+def test_only_the_newest_profiles_are_kept(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    for i in range(5):
+        path = tmp_path / f"profile-{i}.collapsed"
+        path.write_text("main 1\n")
+        os.utime(path, (1000 + i, 1000 + i))
+    profiler.prune_profiles(keep=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["profile-3.collapsed", "profile-4.collapsed"]
+
+def test_requests_without_samples_save_nothing(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiler, "PROFILE_TOKEN", "s3cret")
+    # An interval far longer than the request, so no sample is ever taken
+    monkeypatch.setattr(profiler, "SamplingProfiler", functools.partial(profiler.SamplingProfiler, 60))
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/chat", "headers": [(b"x-profile", b"s3cret")]}
+    middleware = profiler.ProfilingMiddleware(app)
+    asyncio.run(middleware(scope, None, send))
+    assert any(name == b"x-profile-id" for name, _ in sent[0]["headers"])
+    assert list(tmp_path.iterdir()) == []
+    assert middleware.active == 0
@@ -0,0 +1,156 @@
+# backend/tests/test_scheduler.py
+from backend.services.scheduler import ModelScheduler, ModelOverloaded
+from backend.services.fake_model import FakeModel
+from backend.services import gemini
+import asyncio
+import threading
+import time
+import pytest
+
+def _wait_for_queue(sched: ModelScheduler, depth: int):
+    deadline = time.monotonic() + 2
+    while sched.stats()["queue_depth"] < depth:
+        assert time.monotonic() < deadline, "waiters never queued"
+        time.sleep(0.005)
+
+def test_slots_are_granted_by_priority():
+    sched = ModelScheduler(1, {}, 5.0, 10)
+    order = []
+
+    def call(priority):
+        with sched.slot(priority):
+            order.append(priority)
+
+    with sched.slot("interactive"):
+        threads = []
+        # Enqueued worst priority first, so FIFO order would be the reverse
+        for depth, priority in enumerate(["batch", "summary", "interactive", "intent"], start=1):
+            thread = threading.Thread(target=call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            _wait_for_queue(sched, depth)
+    for thread in threads:
+        thread.join()
+    assert order == ["intent", "interactive", "summary", "batch"]
+
+def test_per_intent_limit_only_holds_back_that_intent():
+    sched = ModelScheduler(4, {"chitchat": 1}, 0.1, 10)
+    with sched.slot("interactive", "chitchat"):
+        with sched.slot("interactive", "find_product"):
+            assert sched.stats()["running_by_intent"] == {"chitchat": 1, "find_product": 1}
+        with pytest.raises(ModelOverloaded):
+            with sched.slot("interactive", "chitchat"):
+                pass
+    with sched.slot("interactive", "chitchat"):
+        pass
+
+def test_waiters_are_shed_after_queue_wait_and_beyond_queue_depth():
+    sched = ModelScheduler(1, {}, 0.1, 1)
+    errors = []
+
+    def queued_call():
+        try:
+            with sched.slot():
+                pass
+        except ModelOverloaded as e:
+            errors.append(e)
+
+    with sched.slot():
+        waiter = threading.Thread(target=queued_call)
+        waiter.start()
+        _wait_for_queue(sched, 1)
+        start = time.monotonic()
+        with pytest.raises(ModelOverloaded):
+            with sched.slot():
+                pass
+        assert time.monotonic() - start < 0.05, "a full queue sheds without waiting"
+        waiter.join()
+    assert len(errors) == 1, "the queued call timed out while the slot stayed taken"
+    stats = sched.stats()
+    assert stats["shed_queue_full"] == 1
+    assert stats["shed_timeout"] == 1
+    assert stats["queue_depth"] == 0
+
+def test_thread_slot_waits_for_async_holder_without_blocking_the_loop():
+    sched = ModelScheduler(1, {}, 2.0, 10)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        async def holder():
+            async with sched.aslot("summary"):
+                await asyncio.sleep(0.05)
+
+        def blocking_call():
+            with sched.slot("interactive"):
+                return time.monotonic()
+
+        tick_task = asyncio.create_task(ticker())
+        hold_task = asyncio.create_task(holder())
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        granted = await asyncio.to_thread(blocking_call)
+        await hold_task
+        tick_task.cancel()
+        return granted - start, ticks
+
+    waited, ticks = asyncio.run(main())
+    assert waited < 0.5, "the sync waiter got the slot as soon as the async holder released it"
+    assert ticks >= 5, "the event loop kept running while the sync call queued"
+
+def test_fake_model_calls_go_through_the_scheduler(monkeypatch):
+    sched = ModelScheduler(1, {}, 0.2, 10)
+    monkeypatch.setattr(gemini, "scheduler", sched)
+    monkeypatch.setattr(gemini, "_model", FakeModel(latency=0.05, max_concurrent=1))
+
+    async def main():
+        calls = [asyncio.to_thread(gemini.generate_content, "hello") for _ in range(2)]
+        return await asyncio.gather(*calls)
+
+    responses = asyncio.run(main())
+    assert [response.text for response in responses] == ["This is a canned answer from the fake model."] * 2
+    # Without admission control the second concurrent call would hit the fake quota
+    assert sched.stats()["quota_errors"] == 0
+    assert sched.stats()["granted"] == 2
+
+def test_fake_model_quota_surfaces_as_overloaded(monkeypatch):
+    monkeypatch.setattr(gemini, "scheduler", ModelScheduler(2, {}, 1.0, 10))
+    monkeypatch.setattr(gemini, "_model", FakeModel(latency=0.05, max_concurrent=1))
+
+    async def main():
+        calls = [asyncio.to_thread(gemini.generate_content, "hello") for _ in range(2)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert sum(isinstance(result, ModelOverloaded) for result in results) == 1
+    assert gemini.scheduler.stats()["quota_errors"] == 1
+
+def test_http_chitchat_does_not_block_the_loop(monkeypatch):
+    pytest.importorskip("fastapi")
+    from backend.intents.chitchat import handle_chitchat
+
+    sched = ModelScheduler(1, {}, 2.0, 10)
+    monkeypatch.setattr(gemini, "scheduler", sched)
+    monkeypatch.setattr(gemini, "_model", FakeModel(latency=0.01))
+
+    async def main():
+        async def holder():
+            async with sched.aslot("summary"):
+                await asyncio.sleep(0.05)
+
+        hold_task = asyncio.create_task(holder())
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        result = await handle_chitchat("hi", "chitchat")
+        await hold_task
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(main())
+    assert result["intent"] == "chitchat"
+    assert elapsed < 0.5
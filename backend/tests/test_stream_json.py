@@ -0,0 +1,60 @@
+# backend/tests/test_stream_json.py
+from backend.services.products import extract_products_from_response, parse_search_stream
+import json
+import random
+import pytest
+
+def _payload(items: int) -> dict:
+    blocks = [
+        {
+            "brand": {"label": f"Brand {i % 3}"},
+            "natureLabel": f"Nature {i % 2}",
+            "url": f"https://www.decathlon.com/p/{i}",
+            "webLabel": f"Produit {i} – été",
+            "score": 0.5 + i,
+            "models": [
+                {
+                    "webLabel": f"Product {i} model {m}",
+                    "image": {"url": f"https://contents.mediadecathlon.com/p{i}/m{m}.jpg"},
+                    "price": 19.99 + m,
+                    "url": f"https://www.decathlon.com/p/{i}?mc={m}",
+                    "availableSizes": ["S", "M"],
+                }
+                for m in range(2)
+            ],
+        }
+        for i in range(items)
+    ]
+    # Scalar numbers the walker reads directly, around and after the items
+    return {
+        "version": 1.5,
+        "data": {"total": 123.5, "ratio": -2.5e-3, "blocks": {"count": 7.25, "items": blocks}, "page": 1e2},
+        "stats": {"took": 42.5, "llm_output": {"category": "tents", "confidence": 0.75}},
+        "elapsed": 3.0,
+    }
+
+def _chunks(body: bytes, boundaries: list[int]) -> list[bytes]:
+    edges = [0] + sorted(boundaries) + [len(body)]
+    return [body[a:b] for a, b in zip(edges, edges[1:])]
+
+@pytest.mark.parametrize("include_metadata", [False, True])
+@pytest.mark.parametrize("max_items", [1, 3, 100])
+def test_every_single_split_matches_full_parse(max_items, include_metadata):
+    payload = _payload(3)
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    expected = extract_products_from_response(payload, max_items, include_metadata)
+    for split in range(1, len(body)):
+        products, metadata, _ = parse_search_stream(_chunks(body, [split]), max_items, include_metadata)
+        assert ((products, metadata) if include_metadata else products) == expected, f"split at {split}"
+
+def test_random_chunkings_match_full_parse():
+    rng = random.Random(1234)
+    for case in range(300):
+        payload = _payload(rng.randint(0, 6))
+        body = json.dumps(payload, ensure_ascii=False, indent=rng.choice([None, 1])).encode()
+        max_items = rng.randint(1, 15)
+        include_metadata = rng.random() < 0.5
+        boundaries = rng.sample(range(1, len(body)), min(len(body) - 1, rng.randint(1, 40)))
+        products, metadata, _ = parse_search_stream(_chunks(body, boundaries), max_items, include_metadata)
+        expected = extract_products_from_response(payload, max_items, include_metadata)
+        assert ((products, metadata) if include_metadata else products) == expected, f"case {case}"
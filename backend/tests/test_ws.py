@@ -0,0 +1,31 @@
+# backend/tests/test_ws.py
+import pytest
+
+pytest.importorskip("fastapi.testclient")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.routes import ws
+
+@pytest.fixture
+def client(monkeypatch):
+    async def route_intent(query, products=None, websocket=None, page_size=None):
+        return {"result": f"echo {query}", "products": [], "intent": "chitchat"}
+
+    monkeypatch.setattr(ws, "route_intent", route_intent)
+    app = FastAPI()
+    app.include_router(ws.router)
+    return TestClient(app)
+
+def test_bad_messages_fail_alone_and_keep_the_socket_open(client):
+    with client.websocket_connect("/ws") as socket:
+        socket.send_text("not json")
+        assert socket.receive_json() == {"id": None, "event": "error", "message": "Messages must be valid JSON"}
+        socket.send_json(["a", "list"])
+        assert socket.receive_json()["event"] == "error"
+        socket.send_json({"id": "d", "query": None})
+        assert socket.receive_json() == {"id": "d", "event": "error", "message": "query must be a string"}
+        socket.send_json({"id": "p", "query": "hi", "page_size": "ten"})
+        assert socket.receive_json()["id"] == "p"
+
+        socket.send_json({"id": "ok", "query": "Hi"})
+        assert socket.receive_json() == {"id": "ok", "event": "result", "result": "echo hi", "products": [], "intent": "chitchat"}
@@ -7,6 +7,7 @@ import { useState, useRef, useEffect } from "react"
 import styles from "./Chat.module.css"
 import SearchingIndicator from "../SearchingIndicator/SearchingIndicator"
 import Toaster from "../Toaster/Toaster";
+import { sendChat } from "@/lib/chatSocket";
 
 interface Message {
   id: string
@@ -325,15 +326,7 @@ const Chat = ({ onMessageSent }: ChatProps) => {
         console.log("[DEBUG] Showing toaster: Preparing comparison...");
         showToaster("Preparing comparison...");
         // Send comparison request
-        const response = await fetch('http://localhost:8182/chat', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ query: fullQuery, products: productTags })
-        })
-
-        if (!response.ok) throw new Error('Comparison request failed')
-
-        const data = await response.json()
+        const data = await sendChat(fullQuery, productTags)
         
         if (data.result && typeof data.result === 'object') {
           // Send comparison to Canvas
@@ -355,16 +348,21 @@ const Chat = ({ onMessageSent }: ChatProps) => {
           throw new Error('Invalid comparison response format')
         }
       } else {
-        // Handle non-comparison queries
-        const response = await fetch("http://localhost:8182/chat", {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ query: fullQuery, products: productTags })
+        // Handle non-comparison queries. The summary arrives with the result;
+        // a model-written narrative may stream in afterwards and is appended to it.
+        const botMessageId = `${Date.now()}-bot`
+        let summary: string | null = null
+        let narrative = ""
+        const data = await sendChat(fullQuery, productTags, (event) => {
+          if (event.event === "toaster") showToaster(event.message)
+          if (event.event === "narrative") {
+            narrative += event.content
+            if (summary === null) return
+            const text = `${summary}\n\n---\n\n${narrative}`
+            setMessages(prev => prev.map(message => message.id === botMessageId ? { ...message, text } : message))
+          }
         })
-
-        if (!response.ok) throw new Error("API request failed")
-
-        const data = await response.json()
+        summary = data.result
 
         if (data.products?.length > 0) {
           window.dispatchEvent(new CustomEvent("productsLoaded", {
@@ -373,8 +371,8 @@ const Chat = ({ onMessageSent }: ChatProps) => {
         }
 
         setMessages(prev => [...prev, {
-          id: Date.now().toString(),
-          text: data.result,
+          id: botMessageId,
+          text: narrative ? `${data.result}\n\n---\n\n${narrative}` : data.result,
           sender: "bot",
           specialContent: data.intent === "find_product" ? {
             type: "search",
@@ -383,6 +381,8 @@ const Chat = ({ onMessageSent }: ChatProps) => {
         }])
       }
     } catch (error) {
+      // Superseded by a newer message on the same socket
+      if ((error as Error).message === "cancelled") return
       console.error("Error:", error)
       setMessages(prev => [...prev, {
         id: Date.now().toString(),
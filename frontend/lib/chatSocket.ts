@@ -0,0 +1,104 @@
+// Persistent WebSocket channel to the backend /ws endpoint.
+// Requests are multiplexed by ID over one connection; falls back to POST /chat
+// when the socket cannot be opened. A result flagged with `narrative` keeps its
+// request open for the "narrative" events that follow, until "narrative_done".
+
+const WS_URL = "ws://localhost:8182/ws"
+const CHAT_URL = "http://localhost:8182/chat"
+
+export interface ChatEvent {
+  id: string
+  event: string
+  [key: string]: any
+}
+
+interface PendingRequest {
+  resolve: (result: any) => void
+  reject: (error: Error) => void
+  onEvent?: (event: ChatEvent) => void
+  resolved?: boolean
+  narrativeDone?: boolean
+}
+
+let socket: WebSocket | null = null
+let opening: Promise<WebSocket> | null = null
+let nextId = 0
+const pending = new Map<string, PendingRequest>()
+// Last product payload per query, revalidated with If-None-Match on the HTTP fallback
+const etagCache = new Map<string, { etag: string; data: any }>()
+
+function connect(): Promise<WebSocket> {
+  if (socket && socket.readyState === WebSocket.OPEN) return Promise.resolve(socket)
+  if (opening) return opening
+
+  opening = new Promise((resolve, reject) => {
+    const ws = new WebSocket(WS_URL)
+    ws.onopen = () => {
+      socket = ws
+      opening = null
+      resolve(ws)
+    }
+    ws.onerror = () => {
+      opening = null
+      reject(new Error("WebSocket connection failed"))
+    }
+    ws.onclose = () => {
+      socket = null
+      pending.forEach((request) => request.reject(new Error("WebSocket closed")))
+      pending.clear()
+    }
+    ws.onmessage = (message) => {
+      const data: ChatEvent = JSON.parse(message.data)
+      const request = pending.get(data.id)
+      if (!request) return
+      if (data.event === "result") {
+        request.resolved = true
+        if (!data.narrative || request.narrativeDone) pending.delete(data.id)
+        request.resolve(data)
+      } else if (data.event === "narrative_done") {
+        request.narrativeDone = true
+        if (request.resolved) pending.delete(data.id)
+      } else if (data.event === "error" || data.event === "cancelled") {
+        pending.delete(data.id)
+        request.reject(new Error(data.event === "cancelled" ? "cancelled" : data.message))
+      } else {
+        request.onEvent?.(data)
+      }
+    }
+  })
+  return opening
+}
+
+export async function sendChat(
+  query: string,
+  products: unknown[],
+  onEvent?: (event: ChatEvent) => void,
+): Promise<any> {
+  let ws: WebSocket
+  try {
+    ws = await connect()
+  } catch {
+    const body = JSON.stringify({ query, products })
+    const cached = etagCache.get(body)
+    const response = await fetch(CHAT_URL, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        ...(cached ? { "If-None-Match": cached.etag } : {}),
+      },
+      body,
+    })
+    if (response.status === 304 && cached) return cached.data
+    if (!response.ok) throw new Error("API request failed")
+    const data = await response.json()
+    const etag = response.headers.get("ETag")
+    if (etag) etagCache.set(body, { etag, data })
+    return data
+  }
+
+  const id = `${Date.now()}-${nextId++}`
+  return new Promise((resolve, reject) => {
+    pending.set(id, { resolve, reject, onEvent })
+    ws.send(JSON.stringify({ id, query, products }))
+  })
+}